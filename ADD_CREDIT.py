@@ -1,8 +1,32 @@
 import os
+import re
+import json
+import shutil
+import struct
+
+from search_index import build_search_index, search
 
 # Permanent paths
 SOURCE_DIR = "/storage/emulated/0/FILES_OBB/CREDIT_MOD/dats/"
 OUTPUT_DIR = "/storage/emulated/0/FILES_OBB/REPACK_OBB/REPACK/"
+MAPPING_FILE = "/storage/emulated/0/FILES_OBB/CREDIT_MOD/credits.txt"
+INDEX_FILE = "string_index.json"
+# Bumped when the layout of an index entry changes, so older entries are rebuilt
+INDEX_FORMAT = 3
+
+# Shortest indexed string; shorter texts are found by scanning the .dat directly
+MIN_RUN_CHARS = 4
+UTF8_ENCODING = 'utf-8'
+UTF16_ENCODING = 'utf-16-le'
+# Runs of printable ASCII and well-formed multi-byte UTF-8 characters
+UTF8_RUN = re.compile(rb'(?:[\x20-\x7e]|[\xc2-\xdf][\x80-\xbf]|\xe0[\xa0-\xbf][\x80-\xbf]|[\xe1-\xec\xee\xef][\x80-\xbf]{2}'
+                      rb'|\xed[\x80-\x9f][\x80-\xbf]|\xf0[\x90-\xbf][\x80-\xbf]{2}|[\xf1-\xf3][\x80-\xbf]{3}'
+                      rb'|\xf4[\x80-\x8f][\x80-\xbf]{2}){%d,}' % MIN_RUN_CHARS)
+# Runs of printable ASCII in UTF-16LE
+UTF16_RUN = re.compile(rb'(?:[\x20-\x7e]\x00){%d,}' % MIN_RUN_CHARS)
+# Length prefix of a UTF-16LE FString (negative int32, up to 1024 characters with the terminator)
+# (a lookahead, so a false match cannot hide a real prefix overlapping it)
+FSTRING_UTF16_PREFIX = re.compile(rb'(?=[\x00-\xff][\xfc-\xff]\xff\xff)', re.DOTALL)
 
 def read_binary_file(file_path):
     """Reads the content of a binary file."""
@@ -17,45 +41,315 @@ def read_binary_file(file_path):
         return None
 
 def write_binary_file(file_path, data):
-    """Writes data to a binary file."""
+    """Writes data to a binary file. Returns True if the file was written."""
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Ensure the output directory exists
         with open(file_path, 'wb') as file:
             file.write(data)
         print(f"Modified file saved to: {file_path}")
+        return True
     except Exception as e:
         print(f"An error occurred while writing to the file: {e}")
-
-def replace_string_in_binary(file_path, old_text, new_text):
-    """Replaces a string in a binary file."""
-    # Read the binary file
-    binary_data = read_binary_file(file_path)
-    if binary_data is None:
         return False
 
-    # Convert the strings to bytes
-    old_bytes = old_text.encode('utf-8')
-    new_bytes = new_text.encode('utf-8')
+def utf16_fstrings(binary_data):
+    """
+    Yields (offset, byte length, text) for each UTF-16LE FString: a negative length
+    prefix, then that many UTF-16LE characters ending in a null. This is how UE stores
+    non-ASCII text, which has no byte pattern a run search could find on its own.
+    """
+    for match in FSTRING_UTF16_PREFIX.finditer(binary_data):
+        (length,) = struct.unpack_from('<i', binary_data, match.start())
+        start = match.start() + 4
+        end = start - 2 * length
+        if -length <= MIN_RUN_CHARS or end > len(binary_data) or binary_data[end - 2:end] != b'\x00\x00':
+            continue
+        try:
+            text = binary_data[start:end - 2].decode(UTF16_ENCODING)
+        except UnicodeDecodeError:
+            continue
+        if text.isprintable():
+            yield start, end - 2 - start, text
+
+def extract_string_runs(binary_data):
+    """
+    Extracts printable string runs of at least MIN_RUN_CHARS characters from binary data:
+    UTF-8 runs, UTF-16LE runs of ASCII characters, and UTF-16LE FStrings (which carry
+    the non-ASCII UTF-16 text). Returns a dictionary of text -> list of
+    [offset, max byte length, encoding].
+    """
+    strings = {}
+    for match in UTF8_RUN.finditer(binary_data):
+        text = match.group().decode(UTF8_ENCODING)
+        strings.setdefault(text, []).append([match.start(), match.end() - match.start(), UTF8_ENCODING])
+    utf16_offsets = set()
+    for match in UTF16_RUN.finditer(binary_data):
+        text = match.group().decode(UTF16_ENCODING)
+        strings.setdefault(text, []).append([match.start(), match.end() - match.start(), UTF16_ENCODING])
+        utf16_offsets.add(match.start())
+    for offset, length, text in utf16_fstrings(binary_data):
+        # An all-ASCII FString is already indexed as a run
+        if offset not in utf16_offsets:
+            strings.setdefault(text, []).append([offset, length, UTF16_ENCODING])
+    return strings
+
+def load_string_index():
+    """Loads the string index from disk."""
+    if not os.path.exists(INDEX_FILE):
+        return {}
+    try:
+        with open(INDEX_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (json.JSONDecodeError, OSError):
+        print("String index is unreadable. It will be rebuilt.")
+        return {}
+
+def save_string_index(index):
+    """Saves the string index to disk."""
+    try:
+        with open(INDEX_FILE, 'w', encoding='utf-8') as file:
+            json.dump(index, file, ensure_ascii=False)
+    except Exception as e:
+        print(f"An error occurred while saving the string index: {e}")
+
+def list_dat_files():
+    return sorted(f for f in os.listdir(SOURCE_DIR) if f.endswith('.dat'))
 
-    # Check if the old text exists in the binary data
-    if old_bytes not in binary_data:
+def index_entry_is_current(entry, file_path):
+    """True if an index entry was built from the file as it is now."""
+    if not entry or entry.get('format') != INDEX_FORMAT:
+        return False
+    try:
+        stat = os.stat(file_path)
+    except OSError:
         return False
+    return entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+def refresh_string_index(index):
+    """Re-extracts strings only for .dat files that are new or changed since they were indexed."""
+    dat_files = list_dat_files()
+    changed = False
+    for dat_file in dat_files:
+        file_path = os.path.join(SOURCE_DIR, dat_file)
+        if index_entry_is_current(index.get(dat_file), file_path):
+            continue
+        stat = os.stat(file_path)
+        binary_data = read_binary_file(file_path)
+        if binary_data is None:
+            continue
+        print(f"Indexing strings in {dat_file}...")
+        index[dat_file] = {
+            'format': INDEX_FORMAT,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'strings': extract_string_runs(binary_data)
+        }
+        changed = True
+    for dat_file in set(index) - set(dat_files):
+        del index[dat_file]
+        changed = True
+    if changed:
+        save_string_index(index)
+    return index
+
+# Substring indexes of the indexed strings, built per .dat file on first use in a session
+_substring_indexes = {}
+
+def substring_index(dat_file, entry):
+    """Trigram index over a file's indexed strings, used to find texts inside longer strings."""
+    key = (entry['size'], entry['mtime_ns'])
+    cached = _substring_indexes.get(dat_file)
+    if cached is None or cached[0] != key:
+        cached = (key, build_search_index(entry['strings'], lambda text: (text,)))
+        _substring_indexes[dat_file] = cached
+    return cached[1]
 
-    # Replace the old text with the new text
-    new_binary_data = binary_data.replace(old_bytes, new_bytes.ljust(len(old_bytes), b'\x00'))
+def indexed_locations(dat_file, entry, text):
+    """
+    Occurrences of text in one indexed file: the exact string through the dict, and
+    texts inside longer strings through the trigram index (case-insensitive candidates,
+    then checked case-sensitively).
+    """
+    strings = entry['strings']
+    locations = [list(location) for location in strings.get(text, [])]
+    candidates, _ = search(substring_index(dat_file, entry), text, limit=len(strings))
+    for key in candidates:
+        if key == text or text not in key:
+            continue
+        pos = key.find(text)
+        while pos != -1:
+            for offset, _, encoding in strings[key]:
+                start = offset + len(key[:pos].encode(encoding))
+                locations.append([start, len(text.encode(encoding)), encoding])
+            pos = key.find(text, pos + len(text))
+    return sorted(locations)
 
-    # Write the updated binary data to the output directory
-    file_name = os.path.basename(file_path)
+def scan_file_locations(file_path, text):
+    """
+    Searches one .dat file directly for every UTF-8 and UTF-16LE occurrence of a text,
+    wherever it is (also inside strings the index does not hold).
+    """
+    binary_data = read_binary_file(file_path)
+    if not binary_data:
+        return []
+    locations = []
+    for encoding in (UTF8_ENCODING, UTF16_ENCODING):
+        text_bytes = text.encode(encoding)
+        pos = binary_data.find(text_bytes)
+        while pos != -1:
+            locations.append([pos, len(text_bytes), encoding])
+            pos = binary_data.find(text_bytes, pos + len(text_bytes))
+    return sorted(locations)
+
+def find_text_locations(index, text):
+    """
+    Looks up a text in every .dat file.
+    Returns a dictionary of file name -> list of [offset, max byte length, encoding],
+    one entry per occurrence (a text inside a longer string included).
+    A file is scanned directly, in UTF-8 and UTF-16LE, when its index entry is missing or
+    out of date, or when the text is shorter than MIN_RUN_CHARS (it may stand alone in a
+    run too short to be indexed). Otherwise the index answers; it holds every UTF-8
+    occurrence and UTF-16LE occurrences in ASCII runs and FStrings, so non-ASCII UTF-16LE
+    text outside an FString is not found.
+    """
+    results = {}
+    for dat_file in list_dat_files():
+        file_path = os.path.join(SOURCE_DIR, dat_file)
+        entry = index.get(dat_file)
+        if len(text) >= MIN_RUN_CHARS and index_entry_is_current(entry, file_path):
+            locations = indexed_locations(dat_file, entry, text)
+        else:
+            locations = scan_file_locations(file_path, text)
+        if locations:
+            results[dat_file] = locations
+    return results
+
+def replace_string_in_binary(file_name, locations, new_text):
+    """
+    Writes the new text over each location of a .dat file, padded with null bytes.
+    The edit is made in the copy in OUTPUT_DIR (created from SOURCE_DIR when missing).
+    """
+    for _, max_length, encoding in locations:
+        if len(new_text.encode(encoding)) > max_length:
+            print(f"Error: New text is longer than the original ({max_length} bytes in {encoding}).")
+            return False
     output_file_path = os.path.join(OUTPUT_DIR, file_name)
-    write_binary_file(output_file_path, new_binary_data)
-    return True
+    try:
+        if not os.path.exists(output_file_path):
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            shutil.copyfile(os.path.join(SOURCE_DIR, file_name), output_file_path)
+        with open(output_file_path, 'r+b') as file:
+            for offset, max_length, encoding in locations:
+                file.seek(offset)
+                file.write(new_text.encode(encoding).ljust(max_length, b'\x00'))
+        print(f"Modified file saved to: {output_file_path}")
+        return True
+    except Exception as e:
+        print(f"An error occurred while writing to the file: {e}")
+        return False
+
+def parse_mapping_file(mapping_path):
+    """
+    Reads a credit mapping file with one "OLD TEXT | NEW TEXT" pair per line.
+    Empty lines and lines starting with # are ignored.
+    """
+    mapping = []
+    try:
+        with open(mapping_path, 'r', encoding='utf-8') as file:
+            for line_number, line in enumerate(file, 1):
+                line = line.rstrip('\r\n')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                parts = line.split(' | ')
+                if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
+                    print(f"Skipping line {line_number}: expected 'OLD TEXT | NEW TEXT'.")
+                    continue
+                mapping.append((parts[0].strip(), parts[1].strip()))
+    except FileNotFoundError:
+        print(f"Error: Mapping file '{mapping_path}' not found.")
+    return mapping
+
+def plan_credit_edits(index, mapping):
+    """
+    Resolves and validates every mapping entry before anything is written.
+    Returns a dictionary of file name -> list of (offset, max byte length, encoding, new text).
+    Entries that are not found or do not fit the null-padded slot are left out, and so
+    is an edit that overlaps one at a lower offset of the same file. All are reported.
+    """
+    edits = {}
+    for old_text, new_text in mapping:
+        matches = find_text_locations(index, old_text)
+        if not matches:
+            print(f"NOT FOUND: '{old_text}'")
+            continue
+        too_long = [(max_length, encoding) for locations in matches.values()
+                    for _, max_length, encoding in locations
+                    if len(new_text.encode(encoding)) > max_length]
+        if too_long:
+            max_length, encoding = min(too_long)
+            print(f"TOO LONG: '{new_text}' does not fit in {max_length} bytes ({encoding}) of '{old_text}'")
+            continue
+        for dat_file, locations in matches.items():
+            edits.setdefault(dat_file, []).extend(
+                (offset, max_length, encoding, new_text) for offset, max_length, encoding in locations)
+        print(f"OK: '{old_text}' -> '{new_text}' ({sum(len(l) for l in matches.values())} occurrence(s))")
+    for dat_file, file_edits in edits.items():
+        accepted = []
+        for edit in sorted(file_edits):
+            if accepted and edit[0] < accepted[-1][0] + accepted[-1][1]:
+                print(f"OVERLAP: '{edit[3]}' at offset {edit[0]} in {dat_file} overlaps another edit. Skipped.")
+                continue
+            accepted.append(edit)
+        edits[dat_file] = accepted
+    return edits
+
+def apply_credit_edits(dat_file, file_edits):
+    """
+    Applies all edits of one .dat file with a single read and a single write.
+    Returns True only if the modified file was written.
+    """
+    output_file_path = os.path.join(OUTPUT_DIR, dat_file)
+    read_path = output_file_path if os.path.exists(output_file_path) else os.path.join(SOURCE_DIR, dat_file)
+    binary_data = read_binary_file(read_path)
+    if binary_data is None:
+        return False
+    binary_data = bytearray(binary_data)
+    for offset, max_length, encoding, new_text in file_edits:
+        binary_data[offset:offset + max_length] = new_text.encode(encoding).ljust(max_length, b'\x00')
+    return write_binary_file(output_file_path, binary_data)
+
+def batch_credit(index):
+    """Applies every replacement listed in a mapping file."""
+    mapping_path = input(f"Enter mapping file path (Enter for {MAPPING_FILE}): ").strip() or MAPPING_FILE
+    mapping = parse_mapping_file(mapping_path)
+    if not mapping:
+        print("No replacements found in the mapping file.")
+        return
+    edits = plan_credit_edits(index, mapping)
+    if not edits:
+        print("Nothing to replace.")
+        return
+    modified = 0
+    failed = []
+    for dat_file in sorted(edits):
+        if not edits[dat_file]:
+            continue
+        if apply_credit_edits(dat_file, edits[dat_file]):
+            modified += 1
+        else:
+            failed.append(dat_file)
+    print(f"CREDITS SUCCESSFULLY ADDED TO {modified} FILE(S) 💀")
+    if failed:
+        print(f"FAILED to update {len(failed)} file(s): {', '.join(failed)}")
 
 def main():
+    index = {}
     while True:
         print("\nMenu:")
         print("1. MOD CREDIT")
-        print("2. QUIT")
-        choice = input("Enter your choice (1 or 2): ").strip()
+        print("2. BATCH CREDIT (mapping file)")
+        print("3. QUIT")
+        choice = input("Enter your choice (1, 2 or 3): ").strip()
 
         if choice == '1':
             text_to_find = input("Enter The Text to Find 🔍: ").strip()
@@ -63,46 +357,52 @@ def main():
                 print("Error: Text to find cannot be empty. Please try again.")
                 continue
 
-            # List all .dat files in the source directory
+            # Look the text up in the string index of the source directory
             try:
-                dat_files = [f for f in os.listdir(SOURCE_DIR) if f.endswith('.dat')]
-                if not dat_files:
+                if not index:
+                    index = load_string_index()
+                index = refresh_string_index(index)
+                if not index:
                     print("No .dat files found in the source directory.")
                     continue
 
-                found = False
-                for dat_file in dat_files:
-                    file_path = os.path.join(SOURCE_DIR, dat_file)
-                    binary_data = read_binary_file(file_path)
-
-                    if binary_data and text_to_find.encode('utf-8') in binary_data:
-                        print(f"Text '{text_to_find}' FOUND in file: {dat_file}")
-                        found = True
-
-                        while True:
-                            new_text = input("Enter Your Credit Text🔍: ").strip()
-                            if not new_text:
-                                print("Error: New text cannot be empty. Please try again.")
-                                continue
-
-                            success = replace_string_in_binary(file_path, text_to_find, new_text)
-                            if success:
-                                print(f"CREDIT SUCCESSFULLY ADDED 💀")
-                                break
-                            else:
-                                print("An unexpected error occurred while replacing the text. Please try again.")
-
-                if not found:
+                matches = find_text_locations(index, text_to_find)
+                for dat_file, locations in matches.items():
+                    print(f"Text '{text_to_find}' FOUND in file: {dat_file}")
+
+                    while True:
+                        new_text = input("Enter Your Credit Text🔍: ").strip()
+                        if not new_text:
+                            print("Error: New text cannot be empty. Please try again.")
+                            continue
+
+                        success = replace_string_in_binary(dat_file, locations, new_text)
+                        if success:
+                            print(f"CREDIT SUCCESSFULLY ADDED 💀")
+                            break
+                        else:
+                            print("The text could not be replaced. Please try again.")
+
+                if not matches:
                     print(f"Text '{text_to_find}' was NOT FOUND in any .dat file.")
             except Exception as e:
                 print(f"An unexpected error occurred: {e}")
 
         elif choice == '2':
+            try:
+                if not index:
+                    index = load_string_index()
+                index = refresh_string_index(index)
+                batch_credit(index)
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+
+        elif choice == '3':
             print("Exiting the program. Goodbye!")
             break
 
         else:
-            print("Invalid choice. Please enter 1 or 2.")
+            print("Invalid choice. Please enter 1, 2 or 3.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,6 +2,7 @@ import os
 import re
 import json
 from colorama import Fore, Style, init
+from search_index import build_search_index, search
 
 # Initialize colorama for colorful output
 init(autoreset=True)
@@ -122,9 +123,17 @@ def read_guns_file(txt_file):
         print(Fore.RED + f"❌ Error reading {txt_file}: {e}")
         return []
 
-def find_matching_guns(guns, query):
-    query = query.lower()
-    return [gun for gun in guns if query in gun["name"].lower()]
+def build_gun_index(guns):
+    """Build the search index used by find_matching_guns (once per guns list)."""
+    return build_search_index(guns, lambda gun: (gun["name"],))
+
+def find_matching_guns(gun_index, query):
+    """Return (best matches, total matches) for a gun name query."""
+    return search(gun_index, query)
+
+def print_match_count(matches, total):
+    if total > len(matches):
+        print(Fore.YELLOW + f"Showing the best {len(matches)} of {total} matches. Type more of the name to narrow it down.")
 
 # ===============================
 # Skin Index Parsing & Fuzzy Matching
@@ -524,6 +533,7 @@ def normal_modding(guns, dirs, skin_index_dict):
     if not os.path.exists(repack_folder):
         os.makedirs(repack_folder, exist_ok=True)
     file_modtype_map = {}
+    gun_index = build_gun_index(guns)
     while True:
         changelog_path = os.path.join(repack_folder, "changelog.txt")
         if os.path.exists(changelog_path):
@@ -558,13 +568,14 @@ def normal_modding(guns, dirs, skin_index_dict):
         while True:
             print(Fore.CYAN + "\n🔍 Select Source and Target Guns 🔍\n")
             source_query = input("🎯 Enter the name of the source gun: ").strip()
-            source_matches = find_matching_guns(guns, source_query)
+            source_matches, source_total = find_matching_guns(gun_index, source_query)
             if not source_matches:
                 print(Fore.RED + "❌ No matching source guns found. Try again.")
                 continue
             print(Fore.YELLOW + "\nMatching source guns:")
             for i, gun in enumerate(source_matches):
                 print(f"  {i+1}. {decorate_gun_name(gun)} ({gun['hex']})")
+            print_match_count(source_matches, source_total)
             try:
                 source_choice = int(input("👉 Choose the source gun by number: ")) - 1
                 source_gun = source_matches[source_choice]
@@ -573,13 +584,14 @@ def normal_modding(guns, dirs, skin_index_dict):
                 continue
     
             target_query = input("\n🎯 Enter the name of the target gun: ").strip()
-            target_matches = find_matching_guns(guns, target_query)
+            target_matches, target_total = find_matching_guns(gun_index, target_query)
             if not target_matches:
                 print(Fore.RED + "❌ No matching target guns found. Try again.")
                 continue
             print(Fore.YELLOW + "\nMatching target guns:")
             for i, gun in enumerate(target_matches):
                 print(f"  {i+1}. {decorate_gun_name(gun)} ({gun['hex']})")
+            print_match_count(target_matches, target_total)
             try:
                 target_choice = int(input("👉 Choose the target gun by number: ")) - 1
                 target_gun = target_matches[target_choice]
@@ -1,6 +1,13 @@
 import os
 import json
+import shutil
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init
+from search_index import build_search_index, search
 
 # Initialize colorama
 init(autoreset=True)
@@ -9,6 +16,18 @@ init(autoreset=True)
 TXT_DIR = "/storage/emulated/0/FILES_OBB/MOD_CAR/TXT/"
 DAT_DIR = "/storage/emulated/0/FILES_OBB/MOD_CAR/DATS/"
 REPACK_DIR = "/storage/emulated/0/FILES_OBB/REPACK_OBB/REPACK/"
+OFFSET_CACHE_FILE = "offset_cache.json"
+HISTORY_FILE = "changes_history.jsonl"
+HISTORY_INDEX_FILE = "changes_history.idx"
+LEGACY_HISTORY_FILE = "changes_history.json"
+
+# The 2-byte value swapped for a vehicle sits this many bytes before its HEX
+INDEX_OFFSET = 8
+
+# Bulk workers copy DATs fresh concurrently; journal appends are serialized
+_history_lock = threading.Lock()
+# Parsed history index kept between lookups: file identity, bytes read, applied entries
+_history_cache = {'key': None, 'pos': 0, 'entries': {}}
 
 def clear_screen():
     """Clear the terminal screen."""
@@ -53,8 +72,14 @@ def load_vehicle_data(file_path):
         print(f"{Fore.RED}❌ Error reading file {file_path}: {e}{Style.RESET_ALL}")
     return vehicles
 
-def select_vehicle(vehicles, prompt):
+def build_vehicle_index(vehicles):
+    """Build the name search index used by select_vehicle."""
+    return build_search_index(vehicles, lambda v: (v['name'],))
+
+def select_vehicle(vehicles, prompt, vehicle_index=None):
     """Vehicle selection with explicit input options."""
+    if vehicle_index is None:
+        vehicle_index = build_vehicle_index(vehicles)
     print(f"\n{Fore.CYAN}{prompt}{Style.RESET_ALL}")
     while True:
         print(f"{Fore.MAGENTA}🔍 Choose input method:{Style.RESET_ALL}")
@@ -71,13 +96,15 @@ def select_vehicle(vehicles, prompt):
             print(f"{Fore.RED}❌ HEX not found. Try again.{Style.RESET_ALL}")
             
         elif choice == '2':  # Name search
-            search_term = input(f"{Fore.GREEN}Enter vehicle name: {Style.RESET_ALL}").lower().strip()
-            matches = [v for v in vehicles if search_term in v['name'].lower()]
+            search_term = input(f"{Fore.GREEN}Enter vehicle name: {Style.RESET_ALL}")
+            matches, total = search(vehicle_index, search_term)
             if not matches:
                 print(f"{Fore.RED}❌ No matches. Try again.{Style.RESET_ALL}")
                 continue
             for idx, v in enumerate(matches, 1):
                 print(f"{Fore.YELLOW}{idx}. {v['name']} ({v['hex']}){Style.RESET_ALL}")
+            if total > len(matches):
+                print(f"{Fore.MAGENTA}Showing the best {len(matches)} of {total} matches. Refine the name to narrow it down.{Style.RESET_ALL}")
             while True:
                 pick = input(f"{Fore.GREEN}Choose match by number: {Style.RESET_ALL}").strip()
                 if pick.isdigit() and 1 <= int(pick) <= len(matches):
@@ -97,86 +124,447 @@ def select_vehicle(vehicles, prompt):
         else:
             print(f"{Fore.RED}❌ Invalid option. Please choose 1, 2, or 3.{Style.RESET_ALL}")
 
-def modify_dat_file(source_dat, skin_hex, target_hex, revert=False):
-    """Modify .dat file with proper offset handling."""
+def file_sha1(path):
+    """Return the SHA-1 hex digest of a file, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_offset_cache():
+    """Load the vehicle offset cache (DAT content hash -> offset table)."""
+    if not os.path.exists(OFFSET_CACHE_FILE):
+        return {}
+    try:
+        with open(OFFSET_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        print(f"{Fore.YELLOW}⚠️ Warning: Offset cache is unreadable. Rebuilding it.{Style.RESET_ALL}")
+        return {}
+
+def save_offset_cache(cache):
+    """Save the vehicle offset cache."""
+    with open(OFFSET_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+def collect_vehicle_hexes(txt_files):
+    """Return every vehicle HEX listed in the given .txt files (names relative to TXT_DIR)."""
+    hexes = set()
+    for txt_file in txt_files:
+        for v in load_vehicle_data(os.path.join(TXT_DIR, txt_file)):
+            hexes.add(v['hex'])
+    return hexes
+
+def build_offset_tables(dat_files, hexes):
+    """
+    Return the offset table of every original .dat file, keyed by .dat path.
+    Each table maps a vehicle HEX to [position, original 2 bytes at position-8],
+    or None when the HEX is not in that file. Tables are cached per DAT content
+    hash, so a file is only scanned again when it changes or new HEX values appear.
+    """
+    cache = load_offset_cache()
+    tables = {}
+    live_digests = set()
+    changed = False
+    for source_dat in dat_files:
+        digest = file_sha1(source_dat)
+        live_digests.add(digest)
+        entry = cache.get(digest, {})
+        table = entry.get('offsets', {})
+        missing = [h for h in hexes if h not in table]
+        if missing:
+            print(f"{Fore.CYAN}🔎 Indexing {len(missing)} vehicle(s) in {os.path.basename(source_dat)}...{Style.RESET_ALL}")
+            with open(source_dat, 'rb') as f:
+                data = f.read()
+            for hex_code in missing:
+                try:
+                    pos = data.find(bytes.fromhex(hex_code))
+                except ValueError:
+                    pos = -1
+                if pos < INDEX_OFFSET:
+                    table[hex_code] = None
+                else:
+                    table[hex_code] = [pos, data[pos-INDEX_OFFSET : pos-INDEX_OFFSET+2].hex()]
+            cache[digest] = {'dat': os.path.basename(source_dat), 'offsets': table}
+            changed = True
+        tables[source_dat] = table
+    # Drop tables of .dat files that are no longer in DAT_DIR
+    if changed or set(cache) - live_digests:
+        save_offset_cache({d: e for d, e in cache.items() if d in live_digests})
+    return tables
+
+def build_vehicle_dat_index(offset_tables):
+    """Return a vehicle HEX -> [.dat paths containing it] index built from the offset tables."""
+    index = {}
+    for source_dat, table in offset_tables.items():
+        for hex_code, entry in table.items():
+            if entry is not None:
+                index.setdefault(hex_code, []).append(source_dat)
+    return index
+
+def route_pair(dat_index, skin_hex, target_hex):
+    """Return the .dat files that contain both the skin HEX and the target HEX."""
+    target_dats = set(dat_index.get(target_hex, []))
+    return [d for d in dat_index.get(skin_hex, []) if d in target_dats]
+
+def modify_dat_file(source_dat, skin_hex, target_hex, offset_table, revert=False):
+    """
+    Modify .dat file with proper offset handling.
+    Positions come from the offset table of the original .dat, so each swap or revert
+    is a lookup plus 2-byte positioned reads and writes. A swap copies the target's
+    current bytes in the working copy, so a swap after an earlier one on the same
+    target chains as before (after A→B, C→A gives C B's value); a revert writes the
+    skin's original bytes from the table.
+    """
     try:
-        with open(source_dat, 'rb') as f:
-            data = bytearray(f.read())
-        skin_bytes = bytes.fromhex(skin_hex)
-        target_bytes = bytes.fromhex(target_hex)
-        skin_pos = data.find(skin_bytes)
-        target_pos = data.find(target_bytes)
-        if skin_pos == -1 or target_pos == -1:
+        skin_entry = offset_table.get(skin_hex)
+        target_entry = offset_table.get(target_hex)
+        if skin_entry is None or target_entry is None:
             print(f"\n{Fore.RED}❌ ERROR: One or both HEX values not found in .dat file{Style.RESET_ALL}")
-            print(f"{Fore.RED}Missing: {'Skin HEX' if skin_pos == -1 else 'Target HEX'}{Style.RESET_ALL}")
+            print(f"{Fore.RED}Missing: {'Skin HEX' if skin_entry is None else 'Target HEX'}{Style.RESET_ALL}")
             return None, None, None
-        offset = 8
-        try:
-            skin_original_bytes = data[skin_pos-offset : skin_pos-offset+2]
-            target_original_bytes = data[target_pos-offset : target_pos-offset+2]
-        except IndexError:
-            print(f"\n{Fore.RED}❌ ERROR: Invalid position calculation. HEX might be too close to start of file.{Style.RESET_ALL}")
-            return None, None, None
-        if revert:
-            print(f"\n{Fore.GREEN}🔄 Reverting: {Fore.YELLOW}{skin_original_bytes.hex()} ➡️ {target_original_bytes.hex()}{Style.RESET_ALL}")
-            data[skin_pos-offset : skin_pos-offset+2] = skin_original_bytes
-        else:
-            print(f"\n{Fore.GREEN}🔄 Replacement: {Fore.YELLOW}{skin_original_bytes.hex()} ➡️ {target_original_bytes.hex()}{Style.RESET_ALL}")
-            data[skin_pos-offset : skin_pos-offset+2] = target_original_bytes
+        skin_pos, skin_original_hex = skin_entry
+        target_pos = target_entry[0]
         os.makedirs(REPACK_DIR, exist_ok=True)
         output_path = os.path.join(REPACK_DIR, os.path.basename(source_dat))
-        with open(output_path, 'wb') as f:
-            f.write(data)
+        if os.path.abspath(output_path) != os.path.abspath(source_dat):
+            shutil.copyfile(source_dat, output_path)
+        with open(output_path, 'r+b') as f:
+            f.seek(skin_pos - INDEX_OFFSET)
+            skin_current_hex = f.read(2).hex()
+            f.seek(target_pos - INDEX_OFFSET)
+            target_current_hex = f.read(2).hex()
+            if revert:
+                print(f"\n{Fore.GREEN}🔄 Reverting: {Fore.YELLOW}{skin_current_hex} ➡️ {skin_original_hex}{Style.RESET_ALL}")
+                new_bytes = bytes.fromhex(skin_original_hex)
+            else:
+                print(f"\n{Fore.GREEN}🔄 Replacement: {Fore.YELLOW}{skin_current_hex} ➡️ {target_current_hex}{Style.RESET_ALL}")
+                new_bytes = bytes.fromhex(target_current_hex)
+            f.seek(skin_pos - INDEX_OFFSET)
+            f.write(new_bytes)
         print(f"{Fore.GREEN}✅ Successfully saved modified file to: {Fore.YELLOW}{output_path}{Style.RESET_ALL}")
-        return output_path, skin_original_bytes.hex(), target_original_bytes.hex()
+        return output_path, skin_current_hex, target_current_hex
     except Exception as e:
         print(f"{Fore.RED}❌ Error modifying .dat file: {e}{Style.RESET_ALL}")
         return None, None, None
 
-def load_changes_history():
-    """Load changes history from a JSON file."""
-    history_file = "changes_history.json"
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                data = f.read()
-                if data.strip():
-                    return json.loads(data)
-                else:
-                    print(f"{Fore.YELLOW}⚠️ Warning: Changes history file is empty. Starting with no history.{Style.RESET_ALL}")
-                    return []
-        except json.JSONDecodeError:
-            print(f"{Fore.RED}❌ Error: Changes history file is corrupted. Starting with no history.{Style.RESET_ALL}")
-            return []
-    else:
-        print(f"{Fore.YELLOW}⚠️ Warning: No changes history file found. Starting with no history.{Style.RESET_ALL}")
+def _history_index_line(op, record_id, dat_name, skin_hex, target_hex, offset):
+    """Format one line of the history index (tab separated)."""
+    return f"{op}\t{record_id}\t{dat_name}\t{skin_hex}\t{target_hex}\t{offset}\n"
+
+def _journal_index_line(record, offset):
+    """Return the index line of a journal record found at the given byte offset."""
+    op = record.get('op', "apply")
+    if op == "reset":
+        return _history_index_line(op, record['id'], record['dat'], "", "", offset)
+    dat_name = os.path.basename(record.get('source_dat') or record.get('modified_file', ''))
+    return _history_index_line(op, record['id'], dat_name, record['skin_hex'], record['target_hex'], offset)
+
+def migrate_legacy_history():
+    """Move records from the old changes_history.json into the journal (once)."""
+    if not os.path.exists(LEGACY_HISTORY_FILE) or os.path.exists(HISTORY_FILE):
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, 'r', encoding='utf-8') as f:
+            data = f.read()
+        legacy_changes = json.loads(data) if data.strip() else []
+    except json.JSONDecodeError:
+        print(f"{Fore.RED}❌ Error: Old changes history file is corrupted. It will not be imported.{Style.RESET_ALL}")
+        legacy_changes = []
+    save_changes_history(legacy_changes)
+    os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".bak")
+
+def save_changes_history(changes, op="apply"):
+    """
+    Append change records to the changes history journal.
+    Each record is one JSON line; its byte offset is appended to the index file
+    together with the DAT name and vehicle HEX values, so saving costs only the new records.
+    op is "apply" for new changes or "revert" for reverted ones.
+    """
+    if not changes:
+        return
+    with _history_lock:
+        _append_history(changes, op)
+
+def _append_history(changes, op):
+    _repair_history()
+    index_lines = []
+    with open(HISTORY_FILE, 'ab') as f:
+        for change in changes:
+            record = dict(change)
+            if op == "apply":
+                record['id'] = change.setdefault('id', uuid.uuid4().hex[:12])
+            record['op'] = op
+            record['time'] = int(time.time())
+            offset = f.tell()
+            f.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+            index_lines.append(_journal_index_line(record, offset))
+    with open(HISTORY_INDEX_FILE, 'a', encoding='utf-8') as f:
+        f.writelines(index_lines)
+
+def save_reset_records(dat_names):
+    """
+    Record in the journal that these DATs were copied fresh from the originals,
+    so every change applied to them before is no longer in the file.
+    """
+    if not dat_names:
+        return
+    with _history_lock:
+        _repair_history()
+        index_lines = []
+        with open(HISTORY_FILE, 'ab') as f:
+            for dat_name in dat_names:
+                record = {'id': uuid.uuid4().hex[:12], 'op': "reset", 'dat': dat_name, 'time': int(time.time())}
+                offset = f.tell()
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+                index_lines.append(_journal_index_line(record, offset))
+        with open(HISTORY_INDEX_FILE, 'a', encoding='utf-8') as f:
+            f.writelines(index_lines)
+
+def _cut_torn_journal_line():
+    """Drop a last journal line left without its newline by an interrupted append."""
+    if not os.path.exists(HISTORY_FILE):
+        return
+    with open(HISTORY_FILE, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            cut = f.read(end - start).rfind(b"\n")
+            end = start + cut + 1 if cut != -1 else start
+            if cut != -1:
+                break
+        f.truncate(end)
+
+def _index_matches_journal():
+    """
+    True when the index's last line points at the journal's last record, so both
+    files hold the same records. The journal is written first; an interrupted
+    append or compaction leaves the index short or pointing elsewhere.
+    """
+    journal_size = os.path.getsize(HISTORY_FILE) if os.path.exists(HISTORY_FILE) else 0
+    if not os.path.exists(HISTORY_INDEX_FILE):
+        return journal_size == 0
+    with open(HISTORY_INDEX_FILE, 'rb') as f:
+        index_end = f.seek(0, os.SEEK_END)
+        f.seek(max(0, index_end - 4096))
+        tail = f.read()
+    lines = tail[:tail.rfind(b"\n") + 1].splitlines()
+    parts = lines[-1].decode('utf-8', 'replace').split("\t") if lines else []
+    if len(parts) != 6 or not parts[5].isdigit():
+        return journal_size == 0
+    offset = int(parts[5])
+    if offset >= journal_size:
+        return False
+    with open(HISTORY_FILE, 'rb') as f:
+        if offset:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return False
+        f.seek(offset)
+        f.readline()
+        return f.tell() == journal_size
+
+def _rebuild_history_index():
+    """Rewrite the index from the journal. Unreadable records get a "skip" line so the index still ends at the journal's end."""
+    tmp_index = HISTORY_INDEX_FILE + ".tmp"
+    with open(tmp_index, 'w', encoding='utf-8') as idx:
+        if os.path.exists(HISTORY_FILE):
+            with open(HISTORY_FILE, 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        idx.write(_journal_index_line(json.loads(line.decode('utf-8')), offset))
+                    except (UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+                        idx.write(_history_index_line("skip", "", "", "", "", offset))
+                    offset += len(line)
+    os.replace(tmp_index, HISTORY_INDEX_FILE)
+    _history_cache.update(key=None, pos=0, entries={})
+    print(f"{Fore.YELLOW}⚠️ History index was out of step with the journal and has been rebuilt.{Style.RESET_ALL}")
+
+def _repair_history():
+    """Bring the journal and index back in step after an interrupted write (call with _history_lock held)."""
+    _cut_torn_journal_line()
+    if not _index_matches_journal():
+        _rebuild_history_index()
+
+def _read_history_index():
+    """Return the applied entries, parsing only the index lines added since the last call."""
+    if not os.path.exists(HISTORY_INDEX_FILE):
         return []
+    st = os.stat(HISTORY_INDEX_FILE)
+    key = (st.st_dev, st.st_ino)
+    if _history_cache['key'] != key or st.st_size < _history_cache['pos']:
+        _history_cache.update(key=key, pos=0, entries={})
+    with open(HISTORY_INDEX_FILE, 'rb') as f:
+        f.seek(_history_cache['pos'])
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    _history_cache['pos'] += len(data)
+    entries = _history_cache['entries']
+    for line in data.decode('utf-8').splitlines():
+        parts = line.split("\t")
+        if len(parts) != 6 or not parts[5].isdigit():
+            continue
+        op, record_id, dat_name, skin_hex, target_hex, offset = parts
+        if op == "apply":
+            entries[record_id] = {'id': record_id, 'dat': dat_name, 'skin_hex': skin_hex,
+                                  'target_hex': target_hex, 'offset': int(offset)}
+        elif op == "revert":
+            entries.pop(record_id, None)
+        elif op == "reset":
+            entries = {key: entry for key, entry in entries.items() if entry['dat'] != dat_name}
+    _history_cache['entries'] = entries
+    return [dict(entry) for entry in entries.values()]
+
+def load_history_index():
+    """
+    Load the history index and return the entries of changes that are still applied,
+    in journal order. Each entry has: id, dat, skin_hex, target_hex, offset.
+    A reset record drops every earlier change of its DAT. The index is rebuilt from
+    the journal first if the two are out of step, and the parsed entries are kept
+    so later calls only read the lines appended since.
+    """
+    with _history_lock:
+        _repair_history()
+        return _read_history_index()
+
+def find_history_entries(dat_name=None, vehicle_hex=None):
+    """Return applied history entries for a DAT name and/or a vehicle HEX (as skin or target)."""
+    results = []
+    for entry in load_history_index():
+        if dat_name and entry['dat'] != dat_name:
+            continue
+        if vehicle_hex and vehicle_hex not in (entry['skin_hex'], entry['target_hex']):
+            continue
+        results.append(entry)
+    return results
+
+def read_history_record(offset):
+    """Read a single change record from the journal at the given byte offset."""
+    with open(HISTORY_FILE, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.readline().decode('utf-8'))
+
+def compact_changes_history():
+    """Rewrite the journal and index with only the changes that are still applied."""
+    with _history_lock:
+        _repair_history()
+        entries = _read_history_index()
+        _write_compacted_history(entries)
+        _history_cache.update(key=None, pos=0, entries={})
+    print(f"{Fore.GREEN}✅ History compacted: {len(entries)} applied change(s) kept.{Style.RESET_ALL}")
 
-def save_changes_history(changes):
-    """Save changes history to a JSON file."""
-    history_file = "changes_history.json"
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(changes, f, indent=4)
+def _write_compacted_history(entries):
+    tmp_history = HISTORY_FILE + ".tmp"
+    tmp_index = HISTORY_INDEX_FILE + ".tmp"
+    with open(HISTORY_FILE, 'rb') as src, open(tmp_history, 'wb') as dst, \
+            open(tmp_index, 'w', encoding='utf-8') as idx:
+        for entry in entries:
+            src.seek(entry['offset'])
+            line = src.readline()
+            offset = dst.tell()
+            dst.write(line)
+            idx.write(_history_index_line("apply", entry['id'], entry['dat'],
+                                          entry['skin_hex'], entry['target_hex'], offset))
+    # Journal first: a crash before the index follows is caught by _repair_history
+    os.replace(tmp_history, HISTORY_FILE)
+    os.replace(tmp_index, HISTORY_INDEX_FILE)
+
+def repack_path(original_dat):
+    """Return the repack folder path of an original .dat file."""
+    return os.path.join(REPACK_DIR, os.path.basename(original_dat))
 
 def fresh_start(dat_files):
-    """Perform a fresh start by copying the original .dat file to the repack folder."""
+    """
+    Perform a fresh start by copying the original .dat files to the repack folder.
+    A reset record is journaled for each copied file, so older changes of it no
+    longer count as applied. Returns a dictionary of original .dat path -> repack
+    .dat path, or None on error.
+    """
     if not dat_files:
         print(f"{Fore.RED}❌ Error: No .dat file found in the directory.{Style.RESET_ALL}")
         return None
-    original_dat = dat_files[0]
-    repack_dat = os.path.join(REPACK_DIR, os.path.basename(original_dat))
     os.makedirs(REPACK_DIR, exist_ok=True)
-    if os.path.exists(repack_dat):
-        os.remove(repack_dat)
+    working_dats = {}
     try:
-        with open(original_dat, 'rb') as src, open(repack_dat, 'wb') as dst:
-            dst.write(src.read())
-        print(f"{Fore.GREEN}✅ Fresh start completed. Original .dat file copied to repack folder.{Style.RESET_ALL}")
-        return repack_dat
+        for original_dat in dat_files:
+            repack_dat = repack_path(original_dat)
+            if os.path.exists(repack_dat):
+                os.remove(repack_dat)
+            shutil.copyfile(original_dat, repack_dat)
+            working_dats[original_dat] = repack_dat
+        save_reset_records([os.path.basename(d) for d in working_dats])
+        print(f"{Fore.GREEN}✅ Fresh start completed. {len(working_dats)} original .dat file(s) copied to repack folder.{Style.RESET_ALL}")
+        return working_dats
     except Exception as e:
+        save_reset_records([os.path.basename(d) for d in working_dats])
         print(f"{Fore.RED}❌ Error performing fresh start: {e}{Style.RESET_ALL}")
         return None
 
+def continue_from_saved(dat_files):
+    """Use the saved repack copy of each .dat file, copying originals that have none yet."""
+    working_dats = {}
+    missing = []
+    for original_dat in dat_files:
+        repack_dat = repack_path(original_dat)
+        if os.path.exists(repack_dat):
+            working_dats[original_dat] = repack_dat
+        else:
+            missing.append(original_dat)
+    if missing:
+        print(f"{Fore.RED}❌ Error: No saved copy of {len(missing)} .dat file(s) found in the repack folder. Starting those fresh...{Style.RESET_ALL}")
+        copied = fresh_start(missing)
+        if copied is None:
+            return None
+        working_dats.update(copied)
+    return working_dats
+
+def apply_pair(working_dats, offset_tables, dat_index, skin, target):
+    """
+    Apply one skin -> target swap to every .dat file that contains both vehicles.
+    skin and target are vehicle dictionaries; returns the list of change records.
+    """
+    changes = []
+    routed_dats = route_pair(dat_index, skin['hex'], target['hex'])
+    if not routed_dats:
+        print(f"\n{Fore.RED}❌ ERROR: No .dat file contains both {skin['name']} and {target['name']}{Style.RESET_ALL}")
+        return changes
+    for original_dat in routed_dats:
+        modified_file, original_skin_hex, new_skin_hex = modify_dat_file(
+            working_dats[original_dat], skin['hex'], target['hex'], offset_tables[original_dat])
+        if modified_file:
+            changes.append({
+                'skin_name': skin['name'],
+                'skin_hex': skin['hex'],
+                'target_name': target['name'],
+                'target_hex': target['hex'],
+                'source_dat': original_dat,
+                'modified_file': modified_file,
+                'original_skin_hex': original_skin_hex,
+                'new_skin_hex': new_skin_hex
+            })
+    return changes
+
+def process_dat_pairs(original_dat, pairs, offset_table):
+    """Worker: copy one original .dat fresh and apply all of its routed pairs in order."""
+    working_dats = fresh_start([original_dat])
+    if working_dats is None:
+        return []
+    offset_tables = {original_dat: offset_table}
+    dat_index = build_vehicle_dat_index(offset_tables)
+    changes = []
+    for skin, target in pairs:
+        print(f"\n{Fore.CYAN}Processing: {skin['name']} ({skin['hex']}) -> {target['name']} ({target['hex']}) in {os.path.basename(original_dat)}{Style.RESET_ALL}")
+        changes.extend(apply_pair(working_dats, offset_tables, dat_index, skin, target))
+    return changes
+
 def display_changes_summary(changes, title="SUMMARY OF CHANGES"):
     """Display a summary of all changes made."""
     clear_screen()
@@ -192,7 +580,7 @@ def display_changes_summary(changes, title="SUMMARY OF CHANGES"):
               f"{Fore.MAGENTA}Change Details: {Fore.YELLOW}{change['original_skin_hex']} ➡️ {change['new_skin_hex']}{Style.RESET_ALL}\n")
     print(f"{Fore.GREEN}✅ All changes have been saved successfully.{Style.RESET_ALL}")
 
-def revert_changes(changes):
+def revert_changes(changes, offset_tables):
     """Allow the user to revert multiple changes by selecting numbers separated by commas."""
     while True:
         choice = input(f"\n{Fore.GREEN}Enter the numbers of the changes to revert (comma-separated, e.g., 1,2,3), or type 'q' to quit: {Style.RESET_ALL}").strip()
@@ -218,6 +606,7 @@ def revert_changes(changes):
             modify_dat_file(change_to_revert['modified_file'], 
                             change_to_revert['skin_hex'], 
                             change_to_revert['target_hex'], 
+                            offset_tables[change_to_revert['source_dat']],
                             revert=True)
             reverted_changes.append(change_to_revert)
             del changes[idx - 1]
@@ -225,16 +614,45 @@ def revert_changes(changes):
         print(f"{Fore.GREEN}✅ Changes reverted successfully.{Style.RESET_ALL}")
         return True
 
-def bulk_modding(dat_files):
+def revert_from_history(dat_files, offset_tables):
+    """Revert changes saved in earlier sessions, looked up by vehicle in the history index."""
+    clear_screen()
+    all_txt_path = os.path.join(TXT_DIR, "ALL.txt")
+    if not os.path.exists(all_txt_path):
+        print(f"{Fore.RED}❌ Error: ALL.txt not found in {TXT_DIR}{Style.RESET_ALL}")
+        return
+    vehicles = load_vehicle_data(all_txt_path)
+    vehicle_hex = select_vehicle(vehicles, "Choose the vehicle whose saved changes you want to see:")
+    entries = find_history_entries(vehicle_hex=vehicle_hex)
+    if not entries:
+        print(f"{Fore.YELLOW}No saved changes found for this vehicle.{Style.RESET_ALL}")
+        return
+    records = [read_history_record(entry['offset']) for entry in entries]
+    display_changes_summary(records, title="SAVED CHANGES")
+    dats_by_name = {os.path.basename(d): d for d in dat_files}
+    for record in records:
+        record['source_dat'] = dats_by_name.get(os.path.basename(record.get('source_dat') or record['modified_file']))
+    revertable = [r for r in records if r['source_dat'] is not None]
+    if len(revertable) != len(records):
+        print(f"{Fore.YELLOW}⚠️ Warning: {len(records) - len(revertable)} saved change(s) belong to a .dat that is no longer in {DAT_DIR}.{Style.RESET_ALL}")
+    working_dats = continue_from_saved(sorted({r['source_dat'] for r in revertable}))
+    if working_dats is None:
+        return
+    for record in revertable:
+        record['modified_file'] = working_dats[record['source_dat']]
+    remaining = list(revertable)
+    if revert_changes(remaining, offset_tables):
+        save_changes_history([r for r in revertable if r not in remaining], op="revert")
+
+def bulk_modding(dat_files, offset_tables):
     """
     Perform bulk modding using a list of source and target IDs.
     Always starts fresh and uses the TXT file named ALL.txt.
+    Each pair is routed to the .dat file(s) containing both vehicles, and
+    independent .dat files are processed concurrently; every other .dat file is
+    also copied fresh, so no repack copy keeps swaps from earlier runs.
     """
     clear_screen()
-    # Always perform a fresh start
-    dat_file = fresh_start(dat_files)
-    if dat_file is None:
-        return
 
     # Use the fixed file ALL.txt from the TXT directory
     all_txt_path = os.path.join(TXT_DIR, "ALL.txt")
@@ -244,6 +662,8 @@ def bulk_modding(dat_files):
         return
 
     vehicles = load_vehicle_data(all_txt_path)
+    vehicles_by_id = {v['id']: v for v in vehicles}
+    dat_index = build_vehicle_dat_index(offset_tables)
     
     # Gather bulk entries from user
     print(f"\n{Fore.CYAN}Enter bulk modding pairs (SOURCE ID, TARGET ID), one per line.{Style.RESET_ALL}")
@@ -265,32 +685,37 @@ def bulk_modding(dat_files):
         else:
             print(f"{Fore.RED}❌ Invalid format. Use comma-separated values (e.g., 402213,401985).{Style.RESET_ALL}")
     
-    changes_made = []
-    # Process each bulk entry
+    # Route each bulk entry to the .dat file(s) that contain both vehicles
+    pairs_by_dat = {}
     for source_id, target_id in bulk_entries:
-        source_vehicle = next((v for v in vehicles if v['id'] == source_id), None)
-        target_vehicle = next((v for v in vehicles if v['id'] == target_id), None)
+        source_vehicle = vehicles_by_id.get(source_id)
+        target_vehicle = vehicles_by_id.get(target_id)
         if not source_vehicle or not target_vehicle:
             missing = source_id if not source_vehicle else target_id
             print(f"{Fore.RED}❌ Vehicle with ID {missing} not found. Skipping this entry.{Style.RESET_ALL}")
             continue
-        
-        source_hex = source_vehicle['hex']
-        target_hex = target_vehicle['hex']
-        print(f"\n{Fore.CYAN}Processing: {source_vehicle['name']} ({source_hex}) -> {target_vehicle['name']} ({target_hex}){Style.RESET_ALL}")
-        modified_file, original_skin_hex, new_skin_hex = modify_dat_file(dat_file, source_hex, target_hex)
-        if modified_file:
-            changes_made.append({
-                'skin_name': source_vehicle['name'],
-                'skin_hex': source_hex,
-                'target_name': target_vehicle['name'],
-                'target_hex': target_hex,
-                'modified_file': modified_file,
-                'original_skin_hex': original_skin_hex,
-                'new_skin_hex': new_skin_hex
-            })
-            # Update dat_file for subsequent changes
-            dat_file = modified_file
+        routed_dats = route_pair(dat_index, source_vehicle['hex'], target_vehicle['hex'])
+        if not routed_dats:
+            print(f"{Fore.RED}❌ No .dat file contains both {source_id} and {target_id}. Skipping this entry.{Style.RESET_ALL}")
+            continue
+        for original_dat in routed_dats:
+            pairs_by_dat.setdefault(original_dat, []).append((source_vehicle, target_vehicle))
+    
+    # Bulk mode always starts fresh: DATs without routed pairs are reset to the originals too
+    unrouted = [d for d in sorted(dat_files) if d not in pairs_by_dat]
+    if unrouted:
+        fresh_start(unrouted)
+
+    # Process every .dat file in its own worker; results are merged in .dat order
+    changes_made = []
+    if pairs_by_dat:
+        workers = min(len(pairs_by_dat), os.cpu_count() or 1)
+        print(f"\n{Fore.CYAN}Processing {len(pairs_by_dat)} .dat file(s) with {workers} worker(s)...{Style.RESET_ALL}")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_dat_pairs, original_dat, pairs, offset_tables[original_dat])
+                       for original_dat, pairs in sorted(pairs_by_dat.items())]
+            for future in futures:
+                changes_made.extend(future.result())
     
     display_changes_summary(changes_made)
     save_changes_history(changes_made)
@@ -310,31 +735,44 @@ def main():
         input(f"{Fore.YELLOW}Press Enter to exit...{Style.RESET_ALL}")
         return
     
+    migrate_legacy_history()
+    
+    # One-time (cached) scan of vehicle positions in every original .dat
+    offset_tables = build_offset_tables(dat_files, collect_vehicle_hexes(txt_files))
+    dat_index = build_vehicle_dat_index(offset_tables)
+    
     # Updated Start Options: Bulk Modding now appears as option 3.
     while True:
         print(f"\n{Fore.CYAN}=== START OPTIONS ==={Style.RESET_ALL}")
         print(f"{Fore.YELLOW}1. Fresh Start{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}2. Continue from Last Saved{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}3. Bulk Modding (using ALL.txt){Style.RESET_ALL}")
-        choice = input(f"{Fore.GREEN}Your choice (1/2/3): {Style.RESET_ALL}").strip()
+        print(f"{Fore.YELLOW}4. Revert from History{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}5. Compact History{Style.RESET_ALL}")
+        choice = input(f"{Fore.GREEN}Your choice (1-5): {Style.RESET_ALL}").strip()
         if choice == '1':
-            dat_file = fresh_start(dat_files)
+            working_dats = fresh_start(dat_files)
             changes_made = []
             break
         elif choice == '2':
-            repack_dat = os.path.join(REPACK_DIR, os.path.basename(dat_files[0]))
-            if not os.path.exists(repack_dat):
-                print(f"{Fore.RED}❌ Error: No saved .dat file found in the repack folder. Starting fresh...{Style.RESET_ALL}")
-                dat_file = fresh_start(dat_files)
-            else:
-                dat_file = repack_dat
+            working_dats = continue_from_saved(dat_files)
             changes_made = []
             break
         elif choice == '3':
-            bulk_modding(dat_files)
+            bulk_modding(dat_files, offset_tables)
             return  # Exit main after bulk modding.
+        elif choice == '4':
+            revert_from_history(dat_files, offset_tables)
+        elif choice == '5':
+            if os.path.exists(HISTORY_FILE):
+                compact_changes_history()
+            else:
+                print(f"{Fore.YELLOW}⚠️ No changes history found.{Style.RESET_ALL}")
         else:
             print(f"{Fore.RED}❌ Invalid choice. Try again.{Style.RESET_ALL}")
+    if working_dats is None:
+        input(f"{Fore.YELLOW}Press Enter to exit...{Style.RESET_ALL}")
+        return
     
     # Single modding loop
     while True:
@@ -342,24 +780,14 @@ def main():
         vehicles = load_vehicle_data(txt_file)
         clear_screen()
         print(f"{Fore.CYAN}=== SKIN SELECTION ==={Style.RESET_ALL}")
-        skin_hex = select_vehicle(vehicles, "Choose the SKIN you want to apply:")
-        skin_name = next((v['name'] for v in vehicles if v['hex'] == skin_hex), "Unknown")
+        vehicle_index = build_vehicle_index(vehicles)
+        skin_hex = select_vehicle(vehicles, "Choose the SKIN you want to apply:", vehicle_index)
+        skin = next((v for v in vehicles if v['hex'] == skin_hex), {'hex': skin_hex, 'name': "Unknown"})
         clear_screen()
         print(f"{Fore.CYAN}=== TARGET VEHICLE ==={Style.RESET_ALL}")
-        target_hex = select_vehicle(vehicles, "Choose vehicle to apply the skin to:")
-        target_name = next((v['name'] for v in vehicles if v['hex'] == target_hex), "Unknown")
-        modified_file, original_skin_hex, new_skin_hex = modify_dat_file(dat_file, skin_hex, target_hex)
-        if modified_file:
-            changes_made.append({
-                'skin_name': skin_name,
-                'skin_hex': skin_hex,
-                'target_name': target_name,
-                'target_hex': target_hex,
-                'modified_file': modified_file,
-                'original_skin_hex': original_skin_hex,
-                'new_skin_hex': new_skin_hex
-            })
-            dat_file = modified_file
+        target_hex = select_vehicle(vehicles, "Choose vehicle to apply the skin to:", vehicle_index)
+        target = next((v for v in vehicles if v['hex'] == target_hex), {'hex': target_hex, 'name': "Unknown"})
+        changes_made.extend(apply_pair(working_dats, offset_tables, dat_index, skin, target))
         if input(f"\n{Fore.GREEN}Make another change? (y/n): {Style.RESET_ALL}").lower() != 'y':
             break
         clear_screen()
@@ -371,7 +799,7 @@ def main():
             break
         if input(f"\n{Fore.GREEN}Would you like to revert any changes? (y/n): {Style.RESET_ALL}").lower() != 'y':
             break
-        if not revert_changes(changes_made):
+        if not revert_changes(changes_made, offset_tables):
             break
     
     save_changes_history(changes_made)
@@ -1,4 +1,5 @@
 import os
+import re
 import time
 from termcolor import colored
 from colorama import Fore
@@ -70,53 +71,105 @@ def read_lobbies():
         print(colored("lobby.txt not found.", 'red'))
         return None
 
-# Function to replace the index in hex files
-def replace_index_in_files(hex_sequence, new_index):
+# Function to find every position of a byte pattern (overlapping matches included)
+def find_pattern_positions(file_data, hex_bytes):
+    positions = []
+    pos = file_data.find(hex_bytes)
+    while pos != -1:
+        positions.append(pos)
+        pos = file_data.find(hex_bytes, pos + 1)
+    return positions
+
+# Function to find the matches of several patterns in one pass over the data
+def find_selection_hits(file_data, patterns):
+    if len(patterns) == 1:
+        return [(pos, patterns[0]) for pos in find_pattern_positions(file_data, patterns[0])]
+    # Longest first, so a pattern is never hidden behind one of its prefixes;
+    # the prefixes themselves are added back for each match.
+    ordered = sorted(patterns, key=len, reverse=True)
+    prefixes = {p: [q for q in ordered if q != p and p.startswith(q)] for p in ordered}
+    regex = re.compile(b"(?=(" + b"|".join(re.escape(p) for p in ordered) + b"))", re.DOTALL)
+    hits = []
+    for match in regex.finditer(file_data):
+        pattern = match.group(1)
+        hits.append((match.start(), pattern))
+        hits.extend((match.start(), q) for q in prefixes[pattern])
+    return hits
+
+# Function to replace the index in hex files for several (lobby hex, index) selections
+def replace_indexes_in_files(selections):
     try:
+        # Convert inputs to bytes; a later selection of the same hex wins
+        new_indexes = {}
+        order = {}
+        for n, (hex_sequence, new_index) in enumerate(selections):
+            pattern = bytes.fromhex(hex_sequence)
+            new_indexes[pattern] = (hex_sequence, new_index, bytes.fromhex(new_index)[0])
+            order[pattern] = n  # rank of the hex's last selection
+
         for filename in os.listdir(FILES_PATH):
             file_path = os.path.join(FILES_PATH, filename)
 
             with open(file_path, "rb") as file:
                 file_data = file.read()
 
-            # Convert inputs to bytes
-            new_index_bytes = bytes.fromhex(new_index)
-            hex_bytes = bytes.fromhex(hex_sequence)
-
-            # Look for the pattern and replace the index
-            updated_data = bytearray(file_data)
-            found = False
-
-            # Loop through the data to find the pattern starting from the last byte
-            for i in range(len(file_data) - len(hex_bytes), 7, -1):  # Start 8 bytes before the hex
-                # Check if the hex sequence matches at the current position
-                if file_data[i:i + len(hex_bytes)] == hex_bytes:
-                    # Extract the index byte 8 bytes before the hex sequence (starting from i-8)
-                    index_byte = file_data[i - 8]
+            # The index byte sits 8 bytes before each match; when two selections
+            # point at the same byte the later one wins
+            patches = {}
+            for i, pattern in find_selection_hits(file_data, list(new_indexes)):
+                if i < 8:
+                    continue
+                if i - 8 not in patches or order[pattern] > order[patches[i - 8]]:
+                    patches[i - 8] = pattern
 
-                    # Replace the found index with the new index
-                    updated_data[i - 8] = new_index_bytes[0]  # Replace the single byte index
-                    found = True
-
-                    print(colored(f"Modified {filename}: Replaced index {index_byte:02x} with {new_index} for hex sequence {hex_sequence}.", 'green'))
+            if not patches:
+                print(colored(f"No matching pattern found in {filename}.", 'yellow'))
+                continue
 
-            # Save the updated file
+            updated_data = bytearray(file_data)
+            # Report from the last match to the first, as the byte-by-byte scan did
+            for index_pos in sorted(patches, reverse=True):
+                hex_sequence, new_index, new_index_byte = new_indexes[patches[index_pos]]
+                index_byte = file_data[index_pos]
+                updated_data[index_pos] = new_index_byte  # Replace the single byte index
+                print(colored(f"Modified {filename}: Replaced index {index_byte:02x} with {new_index} for hex sequence {hex_sequence}.", 'green'))
+
+            # Save only files that actually changed
             result_path = os.path.join(RESULT_PATH, filename)
             with open(result_path, "wb") as file:
                 file.write(updated_data)
-
-            if not found:
-                print(colored(f"No matching pattern found in {filename}.", 'yellow'))
     except Exception as e:
         print(colored(f"Error: {e}", 'red'))
 
+# Function to replace the index in hex files
+def replace_index_in_files(hex_sequence, new_index):
+    replace_indexes_in_files([(hex_sequence, new_index)])
+
+# Function to parse batch selections like "1,3,4:0a" (number, optional index override)
+def parse_batch_selection(text, lobbies, def_index):
+    selections = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        number, _, index = item.partition(":")
+        number = int(number) - 1
+        if not 0 <= number < len(lobbies):
+            raise ValueError(f"Invalid selection: {item}")
+        index = index.strip() or def_index
+        bytes.fromhex(index)
+        lobby_hex, lobby_name = lobbies[number]
+        selections.append((lobby_hex, index, lobby_name))
+    return selections
+
 # Main menu
 def main_menu():
     while True:
         display_tool_name()
         color_cycled_text("\nDARKSIDE")
         print(colored("1] MOD LOBBY", 'yellow', attrs=['bold']))
-        print(colored("2] QUIT", 'green', attrs=['bold']))
+        print(colored("2] BATCH MOD LOBBY", 'cyan', attrs=['bold']))
+        print(colored("3] QUIT", 'green', attrs=['bold']))
         choice = input(colored("Choose an option: ", 'magenta', attrs=['bold']))
 
         if choice == "1":
@@ -145,6 +198,31 @@ def main_menu():
                 print(colored("Invalid input. Please enter a number.", 'red'))
 
         elif choice == "2":
+            lobbies = read_lobbies()
+            def_index = read_def_index()
+
+            if not lobbies or not def_index:
+                print(colored("Required files or data missing.", 'red'))
+                continue
+
+            color_cycled_text("\nAvailable Lobbies:")
+            for i, (_, name) in enumerate(lobbies, 1):
+                print(colored(f"{i}. {name}", 'green'))
+
+            batch_choice = input(colored("Select lobby themes by number, comma-separated (use 3:0a to set an index): ", 'magenta', attrs=['bold']))
+
+            try:
+                selections = parse_batch_selection(batch_choice, lobbies, def_index)
+                if selections:
+                    for _, index, lobby_name in selections:
+                        print(colored(f"Modding lobby theme: {lobby_name} (index {index})", 'yellow'))
+                    replace_indexes_in_files([(lobby_hex, index) for lobby_hex, index, _ in selections])
+                else:
+                    print(colored("Invalid selection.", 'red'))
+            except ValueError as e:
+                print(colored(f"Invalid input: {e}", 'red'))
+
+        elif choice == "3":
             print(colored("Exiting the program. Goodbye!", 'yellow'))
             break
         else:
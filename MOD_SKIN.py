@@ -2,6 +2,7 @@ import os
 import re
 from colorama import Fore, Back, Style, init
 import sys
+from search_index import build_search_index, search
 
 # Initialize colorama
 init(autoreset=True)
@@ -100,6 +101,43 @@ def fetch_mod_data(file_path):
         print(f"{Fore.RED}🚨 Error: Unable to decode the file at path: {file_path}")
     return mod_data
 
+def build_mod_index(mod_data):
+    """
+    Builds lookup tables for the loaded mod data once, so bulk entry does not rescan it per line.
+    Returns {'by_id': {SkinID: [ModHex]}, 'by_name': {skin name (lowercase): [ModHex]},
+    'search': ranked search index over SkinID and skin name (used by select_mod_option)}.
+    A list with more than one hex means the ID or name is ambiguous.
+    """
+    by_id = {}
+    by_name = {}
+    for mod_hex, details in mod_data.items():
+        by_id.setdefault(details['description'], []).append(mod_hex)
+        if details['skin_name']:
+            by_name.setdefault(details['skin_name'].lower(), []).append(mod_hex)
+    search_index = build_search_index(mod_data, lambda mod_hex: (mod_data[mod_hex]['description'], mod_data[mod_hex]['skin_name']))
+    return {'by_id': by_id, 'by_name': by_name, 'search': search_index}
+
+def report_duplicate_ids(mod_index):
+    """Prints every SkinID that maps to more than one mod hex."""
+    duplicates = {skin_id: hexes for skin_id, hexes in mod_index['by_id'].items() if len(hexes) > 1}
+    if duplicates:
+        print(f"{Fore.YELLOW}⚠️ {len(duplicates)} duplicate skin ID(s) in TXT data (bulk entry will skip them):")
+        for skin_id, hexes in duplicates.items():
+            print(f"{Fore.YELLOW}   {skin_id}: {', '.join(hexes)}")
+    return duplicates
+
+def resolve_skin_id(mod_index, key):
+    """
+    Resolves a bulk-entry key to a mod hex: by SkinID first, then by exact skin name.
+    Returns (mod_hex, None) on success or (None, reason) if it is missing or ambiguous.
+    """
+    hexes = mod_index['by_id'].get(key) or mod_index['by_name'].get(key.lower(), [])
+    if not hexes:
+        return None, f"{key} not found in the TXT data"
+    if len(hexes) > 1:
+        return None, f"{key} is ambiguous ({', '.join(hexes)})"
+    return hexes[0], None
+
 def fetch_index_hex_from_file(file_path):
     """
     Reads the index file (format: Skin Name - HexCode) and returns a dictionary.
@@ -122,6 +160,16 @@ def fetch_index_hex_from_file(file_path):
     return index_data
 
 # =========================== PROCESS MODS ===========================
+# The source index hex is searched for in this many bytes before the first mod hex occurrence.
+INDEX_WINDOW = 30
+
+def hex_to_bytes(hex_str):
+    """Converts a hex string from the TXT/index files to bytes, or None if it is not valid hex."""
+    try:
+        return bytes.fromhex(hex_str)
+    except ValueError:
+        return None
+
 def process_mods(directory_path, hex_pairs, output_path, item_replacements, index_hex_data, mod_type, txt_file):
     """
     For each file in directory_path:
@@ -129,10 +177,12 @@ def process_mods(directory_path, hex_pairs, output_path, item_replacements, inde
       - Finds the first and second occurrences of the source mod hex.
       - Replaces ONLY the SECOND occurrence with the target mod hex.
       - Then, for the index replacement, it looks for the source index hex only in a window
-        that starts 30 bytes (60 hex characters) before the FIRST occurrence of the source mod hex.
+        that starts INDEX_WINDOW (30) bytes before the FIRST occurrence of the source mod hex.
         Within that window, it replaces only the FIRST occurrence of the source index hex with the target index hex.
       - If the source index hex is not found in the window, it will try all candidates for that outfit.
       - Logs the changes, including a failure reason if the index replacement did not occur.
+    Edits are made in place on the file bytes, so each pair costs a couple of searches
+    instead of rebuilding the whole file as a hex string.
     """
     modified_files = 0
     for file_name in os.listdir(directory_path):
@@ -142,100 +192,98 @@ def process_mods(directory_path, hex_pairs, output_path, item_replacements, inde
             read_path = modded_file_path if os.path.exists(modded_file_path) else original_file_path
 
             with open(read_path, 'rb') as f:
-                content_bytes = f.read()
-            hex_data = content_bytes.hex()
+                content = bytearray(f.read())
             file_modified = False
 
             for idx, (mod_source_hex, mod_target_hex) in enumerate(hex_pairs):
                 item1, item2 = item_replacements[idx]
-                occ = hex_data.count(mod_source_hex)
+                source_bytes = hex_to_bytes(mod_source_hex)
+                target_bytes = hex_to_bytes(mod_target_hex)
+                if source_bytes is None or target_bytes is None:
+                    continue
                 mod_replaced = 0
-                if occ >= 2:
-                    first_index = hex_data.find(mod_source_hex)
-                    second_index = hex_data.find(mod_source_hex, first_index + len(mod_source_hex))
-                    if second_index != -1:
-                        hex_data = hex_data[:second_index] + mod_target_hex + hex_data[second_index+len(mod_source_hex):]
-                        mod_replaced = 1
-                        file_modified = True
+                first_index = content.find(source_bytes)
+                second_index = content.find(source_bytes, first_index + len(source_bytes)) if first_index != -1 else -1
+                if second_index != -1:
+                    content[second_index:second_index + len(source_bytes)] = target_bytes
+                    mod_replaced = 1
+                    file_modified = True
 
                     # Index replacement with fallback to alternate candidates
                     index_failure_reason = ""
-                    if mod_replaced:
-                        if not (item1 in index_hex_data and item2 in index_hex_data):
-                            idx_occ = 0
-                            index_failure_reason = "One or both index outfit names not found in index file."
-                        else:
-                            # For source, try all candidates
-                            source_index_candidates = index_hex_data[item1]
-                            # For target, take the first candidate (or you could also add a fallback here)
-                            target_index_candidates = index_hex_data[item2]
-                            target_index_hex = target_index_candidates[0]
-                            window_start = max(0, first_index - 60)
-                            window_end = first_index  # window before the first occurrence
-                            window = hex_data[window_start:window_end]
-                            found = False
+                    if not (item1 in index_hex_data and item2 in index_hex_data):
+                        idx_occ = 0
+                        index_failure_reason = "One or both index outfit names not found in index file."
+                    else:
+                        # For source, try all candidates
+                        source_index_candidates = index_hex_data[item1]
+                        # For target, take the first candidate (or you could also add a fallback here)
+                        target_index_candidates = index_hex_data[item2]
+                        target_index_hex = target_index_candidates[0]
+                        target_index_bytes = hex_to_bytes(target_index_hex)
+                        window_start = max(0, first_index - INDEX_WINDOW)
+                        window_end = first_index  # window before the first occurrence
+                        index_pos = -1
+                        if target_index_bytes is not None:
                             for candidate in source_index_candidates:
-                                if candidate in window:
+                                candidate_bytes = hex_to_bytes(candidate)
+                                if not candidate_bytes:
+                                    continue
+                                index_pos = content.find(candidate_bytes, window_start, window_end)
+                                if index_pos != -1:
                                     source_index_hex = candidate
-                                    found = True
                                     break
-                            if found:
-                                new_window = window.replace(source_index_hex, target_index_hex, 1)
-                                hex_data = hex_data[:window_start] + new_window + hex_data[window_end:]
-                                idx_occ = 1
-                            else:
-                                idx_occ = 0
-                                index_failure_reason = "Source index hex not found in expected window for any candidate."
-                    else:
-                        idx_occ = 0
-                        index_failure_reason = ""
+                        if index_pos != -1:
+                            content[index_pos:index_pos + len(candidate_bytes)] = target_index_bytes
+                            idx_occ = 1
+                        else:
+                            idx_occ = 0
+                            index_failure_reason = "Source index hex not found in expected window for any candidate."
 
-                    if mod_replaced:
-                        changelog_entries.append({
-                            'mod_type': mod_type,
-                            'source_file': os.path.basename(txt_file),
-                            'file_name': file_name,
-                            'source_item': f"{item1} ({mod_source_hex})",
-                            'target_item': f"{item2} ({mod_target_hex})",
-                            'source_hex': mod_source_hex,
-                            'target_hex': mod_target_hex,
-                            'source_index': source_index_hex if mod_replaced and idx_occ else 'N/A',
-                            'target_index': target_index_hex if mod_replaced and idx_occ else 'N/A',
-                            'occurrences': mod_replaced,
-                            'index_occurrences': idx_occ,
-                            'index_failure_reason': index_failure_reason
-                        })
+                    changelog_entries.append({
+                        'mod_type': mod_type,
+                        'source_file': os.path.basename(txt_file),
+                        'file_name': file_name,
+                        'source_item': f"{item1} ({mod_source_hex})",
+                        'target_item': f"{item2} ({mod_target_hex})",
+                        'source_hex': mod_source_hex,
+                        'target_hex': mod_target_hex,
+                        'source_index': source_index_hex if idx_occ else 'N/A',
+                        'target_index': target_index_hex if idx_occ else 'N/A',
+                        'occurrences': mod_replaced,
+                        'index_occurrences': idx_occ,
+                        'index_failure_reason': index_failure_reason
+                    })
 
             if file_modified:
-                updated_data = bytes.fromhex(hex_data)
                 os.makedirs(output_path, exist_ok=True)
                 output_file_path = os.path.join(output_path, file_name)
                 with open(output_file_path, 'wb') as f:
-                    f.write(updated_data)
+                    f.write(content)
                 modified_files += 1
     return modified_files
 
 # =========================== HELPER: SINGLE PAIR SELECTION ===========================
-def select_mod_option(mod_data):
+def select_mod_option(mod_data, mod_index):
     """Search and select an item from mod data by matching description (SkinID) or skin name.
-       Returns (mod_hex, skin_name)."""
-    search_term = input(f"\n{Fore.CYAN}🔍 Search item: ").lower()
-    results = {}
-    for hex_val, details in mod_data.items():
-        if search_term in details['description'].lower() or search_term in details['skin_name'].lower():
-            results[hex_val] = details
+       Only the best-ranked matches are listed. Returns (mod_hex, skin_name)."""
+    search_term = input(f"\n{Fore.CYAN}🔍 Search item: ")
+    results, total = search(mod_index['search'], search_term)
     if not results:
         print(f"{Fore.RED}🔍 No matches found!")
         return None, None
     print(f"\n{Fore.GREEN}📋 Results:")
-    for idx, (hex_val, details) in enumerate(results.items(), 1):
+    for idx, hex_val in enumerate(results, 1):
+        details = mod_data[hex_val]
         print(f"{Fore.CYAN}{idx}. {details['description']} - {details['skin_name']} ({hex_val})")
+    if total > len(results):
+        print(f"{Fore.YELLOW}Showing the best {len(results)} of {total} matches. Refine the search to narrow it down.")
     while True:
         try:
             choice = int(input(f"\n{Fore.CYAN}🔢 Select item (1-{len(results)}): "))
             if 1 <= choice <= len(results):
-                chosen_hex = list(results.keys())[choice-1]
-                return chosen_hex, results[chosen_hex]['skin_name']
+                chosen_hex = results[choice-1]
+                return chosen_hex, mod_data[chosen_hex]['skin_name']
             print(f"{Fore.RED}❌ Invalid selection!")
         except ValueError:
             print(f"{Fore.RED}❌ Please enter a number!")
@@ -254,6 +302,8 @@ def mod_tool():
         print(f"{Fore.RED}🚨 Failed to load mod data")
         return
 
+    mod_index = build_mod_index(mod_data)
+    report_duplicate_ids(mod_index)
     index_data = fetch_index_hex_from_file(INDEX_FILE_PATH)
     
     hex_pairs = []         # List of tuples: (source mod hex, target mod hex)
@@ -263,16 +313,16 @@ def mod_tool():
         while True:
             print(f"\n{Fore.CYAN}🛠️ Current Mod Type: {mod_type}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}1. Add new replacement pair (search)")
-            print("2. Bulk add skins by ID (sourceID,targetID)")
+            print("2. Bulk add skins by ID or name (sourceID,targetID)")
             print("q. Finish and apply modifications")
             choice = input(f"\n{Fore.CYAN}❔ Your choice (1,2,q): ").lower()
             if choice == '1':
                 print(f"\n{Fore.CYAN}🔍 Select source item to replace:")
-                hex1, id1 = select_mod_option(mod_data)
+                hex1, id1 = select_mod_option(mod_data, mod_index)
                 if not hex1:
                     continue
                 print(f"\n{Fore.CYAN}🎯 Select target replacement item:")
-                hex2, id2 = select_mod_option(mod_data)
+                hex2, id2 = select_mod_option(mod_data, mod_index)
                 if not hex2:
                     continue
                 hex_pairs.append((hex1, hex2))
@@ -295,20 +345,15 @@ def mod_tool():
                         print(f"{Fore.RED}❌ Format error. Use: sourceID,targetID")
                         continue
                     src_id, tgt_id = [s.strip() for s in line.split(',', 1)]
-                    src_hex = None
-                    tgt_hex = None
-                    src_name = None
-                    tgt_name = None
-                    for mod_hex, data in mod_data.items():
-                        if data["description"] == src_id:
-                            src_hex = mod_hex
-                            src_name = data["skin_name"]
-                        if data["description"] == tgt_id:
-                            tgt_hex = mod_hex
-                            tgt_name = data["skin_name"]
-                    if not src_hex or not tgt_hex:
-                        print(f"{Fore.RED}❌ One or both skin IDs not found in the TXT data.")
+                    src_hex, src_error = resolve_skin_id(mod_index, src_id)
+                    tgt_hex, tgt_error = resolve_skin_id(mod_index, tgt_id)
+                    if src_error or tgt_error:
+                        for error in (src_error, tgt_error):
+                            if error:
+                                print(f"{Fore.RED}❌ Skipped {line}: {error}.")
                     else:
+                        src_name = mod_data[src_hex]["skin_name"]
+                        tgt_name = mod_data[tgt_hex]["skin_name"]
                         hex_pairs.append((src_hex, tgt_hex))
                         item_replacements.append((src_name, tgt_name))
                         print(f"{Fore.GREEN}✅ Added bulk replacement: {src_id} → {tgt_id}")
@@ -327,11 +372,11 @@ def mod_tool():
             choice = input(f"\n{Fore.CYAN}❔ Your choice (1-2): ")
             if choice == '1':
                 print(f"\n{Fore.CYAN}🔍 Select source item to replace:")
-                hex1, id1 = select_mod_option(mod_data)
+                hex1, id1 = select_mod_option(mod_data, mod_index)
                 if not hex1:
                     continue
                 print(f"\n{Fore.CYAN}🎯 Select target replacement item:")
-                hex2, id2 = select_mod_option(mod_data)
+                hex2, id2 = select_mod_option(mod_data, mod_index)
                 if not hex2:
                     continue
                 hex_pairs.append((hex1, hex2))
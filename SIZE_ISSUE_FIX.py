@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 import os
 import re
+import json
+import hashlib
+
+from id_scan import WORKERS, find_id_positions, null_id_positions, run_in_pool
 
 # ANSI color codes for decoration
 GREEN  = "\033[92m"
@@ -15,6 +19,9 @@ CROSS = "❌"
 FIRE  = "🔥"
 INFO  = "ℹ️"
 
+# Manifest of the last run, kept in the processed folder
+MANIFEST_FILE = ".size_fix_manifest.json"
+
 def normalize_gun_name(gun_name):
     """
     Normalize a gun name by:
@@ -92,7 +99,148 @@ def parse_longhex(longhex_file):
             lh[parts[0]] = parts[1]
     return lh
 
-def process_files(files_dir, guns_list, combined_excluded, longhex_dict):
+def null_hex_candidates(data, candidates):
+    """
+    Null every candidate hex found in data, in one scan per hex width.
+    candidates is a list of (gun name, hex string, hex bytes) in processing order.
+    Returns the new data and the (gun name, hex string) of each candidate that was found;
+    a hex listed twice is only reported for its first gun.
+    """
+    hits = find_id_positions(data, [hex_bytes for _, _, hex_bytes in candidates])
+    found = []
+    reported = set()
+    for gun_name, hex_str, hex_bytes in candidates:
+        if hex_bytes in hits and hex_bytes not in reported:
+            reported.add(hex_bytes)
+            found.append((gun_name, hex_str))
+    if hits:
+        data = null_id_positions(data, hits)
+    return data, found
+
+def hash_bytes(data):
+    """Return the SHA-1 hex digest of a bytes object."""
+    return hashlib.sha1(data).hexdigest()
+
+def hash_json(value):
+    """Return a stable SHA-1 hex digest of a JSON-serializable value."""
+    return hash_bytes(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+def load_manifest(files_dir):
+    """
+    Load the manifest of the last run from files_dir.
+    It maps each file (relative path) to its result and the key it was produced for:
+    [file hash after processing, catalog hash, exclusion set hash].
+    """
+    manifest_path = os.path.join(files_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (ValueError, OSError) as e:
+        print(f"{RED}{CROSS} Ignoring unreadable manifest {manifest_path}: {e}{RESET}")
+        return {}
+
+def save_manifest(files_dir, manifest):
+    manifest_path = os.path.join(files_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+    except Exception as e:
+        print(f"{RED}{CROSS} Error writing manifest: {e}{RESET}")
+
+def process_file(file_path, guns_list, combined_excluded, longhex_dict, input_hashes, previous=None):
+    """
+    Process a single file (see process_files for the three branches).
+    input_hashes is [catalog hash, exclusion set hash]. When previous (the manifest entry
+    of the last run) was produced for the same file content and input hashes, the file is
+    not scanned again and previous is returned with "reused" set.
+    Returns a result dictionary with: key, modified, log, normal, longhex, reused and
+    messages (console lines, printed by the caller); key is None if the file could not
+    be read or written.
+    Runs in a worker process or thread, so it does not print.
+    """
+    exception_files = {"00065947", "00065948", "00065949"}
+    file_base = os.path.splitext(os.path.basename(file_path))[0]
+    messages = []
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except Exception as e:
+        messages.append(f"{RED}{CROSS} Error reading {file_path}: {e}{RESET}")
+        return {"key": None, "modified": False, "log": [], "normal": 0, "longhex": 0,
+                "reused": False, "messages": messages}
+    
+    key = [hash_bytes(data)] + list(input_hashes)
+    if previous and previous.get("key") == key:
+        return dict(previous, reused=True, messages=messages)
+    
+    modified = False
+    normal_replacements = 0
+    longhex_replacements = 0
+    file_log = []  # Log for this file
+    
+    # Branch 1: Files exactly "00065947", "00065948", "00065949" → process longhex for leveled guns.
+    if file_base in exception_files:
+        candidates = []
+        for lh_gun, lh_val in longhex_dict.items():
+            if "(lv" not in lh_gun.lower():
+                continue
+            if normalize_gun_name(lh_gun) in combined_excluded:
+                continue
+            try:
+                candidates.append((lh_gun, lh_val, bytes.fromhex(lh_val)))
+            except ValueError:
+                messages.append(f"{RED}{CROSS} Invalid longhex '{lh_val}' for gun '{lh_gun}' in {file_path}{RESET}")
+        data, found = null_hex_candidates(data, candidates)
+        for lh_gun, lh_val in found:
+            modified = True
+            longhex_replacements += 1
+            file_log.append(f"   - {lh_gun}: replaced longhex {lh_val}")
+    
+    # Branch 2: Files with "00061" in the name → process normal hex for leveled guns only.
+    # Branch 3: All other files → process normal hex for all guns.
+    else:
+        leveled_only = "00061" in file_base
+        candidates = []
+        for gun in guns_list:
+            if leveled_only and "(lv" not in gun['gun_name'].lower():
+                continue
+            if gun['normalized'] in combined_excluded:
+                continue
+            try:
+                candidates.append((gun['gun_name'], gun['hex'], bytes.fromhex(gun['hex'])))
+            except ValueError:
+                messages.append(f"{RED}{CROSS} Invalid hex '{gun['hex']}' for gun '{gun['gun_name']}' in {file_path}{RESET}")
+        data, found = null_hex_candidates(data, candidates)
+        for gun_name, gun_hex in found:
+            modified = True
+            normal_replacements += 1
+            file_log.append(f"   - {gun_name}: replaced normal hex {gun_hex}")
+    
+    if modified:
+        try:
+            with open(file_path, 'wb') as f:
+                f.write(data)
+            messages.append(f"{GREEN}{CHECK} Modified {file_path}{RESET}")
+            key[0] = hash_bytes(data)
+        except Exception as e:
+            messages.append(f"{RED}{CROSS} Error writing {file_path}: {e}{RESET}")
+            key = None
+            modified = False
+            file_log = []
+    
+    return {
+        "key": key,
+        "modified": modified,
+        "log": file_log,
+        "normal": normal_replacements,
+        "longhex": longhex_replacements,
+        "reused": False,
+        "messages": messages
+    }
+
+def process_files(files_dir, guns_list, combined_excluded, longhex_dict, workers=1):
     """
     Process files in files_dir according to three branches:
     
@@ -107,98 +255,55 @@ def process_files(files_dir, guns_list, combined_excluded, longhex_dict):
           → Null normal hex (from guns.txt) for all guns.
       
     In all branches, skip guns whose normalized name is in combined_excluded.
+    Files whose content, catalog (guns.txt/longhex.txt) and exclusion set are unchanged
+    since the last run are skipped and their previous log entries are reused; they
+    count only as skipped, so the modified and replacement totals cover this run.
+    With workers > 1, files are processed concurrently; results are merged in walk
+    order, so log.txt and the totals are the same as in a serial run.
     A log is generated and saved as log.txt in files_dir.
     """
-    exception_files = {"00065947", "00065948", "00065949"}
+    input_hashes = [hash_json([guns_list, longhex_dict]), hash_json(sorted(combined_excluded))]
+    manifest = load_manifest(files_dir)
+    new_manifest = {}
     
     total_normal_replacements = 0
     total_longhex_replacements = 0
     total_files_modified = 0
+    total_files_skipped = 0
     log_entries = []
     log_entries.append("Log of Hex Replacements (Normal and Longhex):")
     log_entries.append("=" * 50)
     log_entries.append("")
     
+    file_paths = []
     for root, _, files in os.walk(files_dir):
         for file in files:
             file_path = os.path.join(root, file)
-            file_base = os.path.splitext(file)[0]
-            try:
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-            except Exception as e:
-                print(f"{RED}{CROSS} Error reading {file_path}: {e}{RESET}")
-                continue
-            
-            modified = False
-            file_log = []  # Log for this file
-            
-            # Branch 1: Files exactly "00065947", "00065948", "00065949" → process longhex for leveled guns.
-            if file_base in exception_files:
-                for lh_gun, lh_val in longhex_dict.items():
-                    if "(lv" not in lh_gun.lower():
-                        continue
-                    if normalize_gun_name(lh_gun) in combined_excluded:
-                        continue
-                    try:
-                        lh_bytes = bytes.fromhex(lh_val)
-                    except ValueError:
-                        print(f"{RED}{CROSS} Invalid longhex '{lh_val}' for gun '{lh_gun}' in {file_path}{RESET}")
-                        continue
-                    null_bytes = b'\x00' * len(lh_bytes)
-                    if lh_bytes in data:
-                        data = data.replace(lh_bytes, null_bytes)
-                        modified = True
-                        total_longhex_replacements += 1
-                        file_log.append(f"   - {lh_gun}: replaced longhex {lh_val}")
-            
-            # Branch 2: Files with "00061" in the name → process normal hex for leveled guns only.
-            elif "00061" in file_base:
-                for gun in guns_list:
-                    if "(lv" not in gun['gun_name'].lower():
-                        continue
-                    if gun['normalized'] in combined_excluded:
-                        continue
-                    try:
-                        hex_bytes = bytes.fromhex(gun['hex'])
-                    except ValueError:
-                        print(f"{RED}{CROSS} Invalid hex '{gun['hex']}' for gun '{gun['gun_name']}' in {file_path}{RESET}")
-                        continue
-                    null_bytes = b'\x00' * len(hex_bytes)
-                    if hex_bytes in data:
-                        data = data.replace(hex_bytes, null_bytes)
-                        modified = True
-                        total_normal_replacements += 1
-                        file_log.append(f"   - {gun['gun_name']}: replaced normal hex {gun['hex']}")
-            
-            # Branch 3: All other files → process normal hex for all guns.
-            else:
-                for gun in guns_list:
-                    if gun['normalized'] in combined_excluded:
-                        continue
-                    try:
-                        hex_bytes = bytes.fromhex(gun['hex'])
-                    except ValueError:
-                        print(f"{RED}{CROSS} Invalid hex '{gun['hex']}' for gun '{gun['gun_name']}' in {file_path}{RESET}")
-                        continue
-                    null_bytes = b'\x00' * len(hex_bytes)
-                    if hex_bytes in data:
-                        data = data.replace(hex_bytes, null_bytes)
-                        modified = True
-                        total_normal_replacements += 1
-                        file_log.append(f"   - {gun['gun_name']}: replaced normal hex {gun['hex']}")
-            
-            if modified:
-                try:
-                    with open(file_path, 'wb') as f:
-                        f.write(data)
-                    total_files_modified += 1
-                    print(f"{GREEN}{CHECK} Modified {file_path}{RESET}")
-                    log_entries.append(f"File: {file_path}")
-                    log_entries.extend(file_log)
-                    log_entries.append("")  # Separator
-                except Exception as e:
-                    print(f"{RED}{CROSS} Error writing {file_path}: {e}{RESET}")
+            if os.path.relpath(file_path, files_dir) != MANIFEST_FILE:
+                file_paths.append(file_path)
+    
+    jobs = [(file_path, guns_list, combined_excluded, longhex_dict, input_hashes,
+             manifest.get(os.path.relpath(file_path, files_dir))) for file_path in file_paths]
+    results = run_in_pool(process_file, jobs, workers)
+    
+    for file_path, result in zip(file_paths, results):
+        for message in result.pop("messages"):
+            print(message)
+        if result["key"] is None:
+            continue
+        reused = result.pop("reused")
+        new_manifest[os.path.relpath(file_path, files_dir)] = result
+        if reused:
+            # Modified by an earlier run: counted only as skipped, but kept in the log
+            total_files_skipped += 1
+        elif result["modified"]:
+            total_files_modified += 1
+            total_normal_replacements += result["normal"]
+            total_longhex_replacements += result["longhex"]
+        if result["modified"]:
+            log_entries.append(f"File: {file_path}" + (" (previous run)" if reused else ""))
+            log_entries.extend(result["log"])
+            log_entries.append("")  # Separator
     
     # Write log.txt in files_dir.
     log_file_path = os.path.join(files_dir, "log.txt")
@@ -208,12 +313,15 @@ def process_files(files_dir, guns_list, combined_excluded, longhex_dict):
         print(f"\n{CYAN}{INFO} Log file 'log.txt' generated in {files_dir}.{RESET}")
     except Exception as e:
         print(f"{RED}{CROSS} Error writing log file: {e}{RESET}")
+    save_manifest(files_dir, new_manifest)
     
     # Summary
     print(f"\n{YELLOW}Summary:{RESET}")
     print(f"{YELLOW}Total files modified: {total_files_modified}{RESET}")
     print(f"{YELLOW}Total normal hex replacements: {total_normal_replacements}{RESET}")
     print(f"{YELLOW}Total longhex replacements: {total_longhex_replacements}{RESET}")
+    if total_files_skipped:
+        print(f"{YELLOW}Unchanged files skipped (previous results reused): {total_files_skipped}{RESET}")
 
 def main():
 # Hard-coded file paths based on your provided locations:
@@ -255,7 +363,7 @@ def main():
     print(f"{CYAN}{FIRE} Total Excluded Guns: {total_excluded}{RESET}")
     
     longhex_dict = parse_longhex(longhex_file)
-    process_files(files_dir, guns_list, combined_excluded, longhex_dict)
+    process_files(files_dir, guns_list, combined_excluded, longhex_dict, workers=WORKERS)
 
 if __name__ == "__main__":
     main()
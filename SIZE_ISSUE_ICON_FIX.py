@@ -3,6 +3,8 @@ import re
 import colorama
 from colorama import Fore, Style
 
+from id_scan import WORKERS, find_id_positions, null_id_positions, run_in_pool
+
 colorama.init(autoreset=True)
 
 # ---------------------------
@@ -69,10 +71,108 @@ def load_valid_hexes():
                 valid_hexes[hex_val] = skin_name
     return valid_hexes
 
+# ---------------------------
+# Helper: Trigram index over the lowercased skin names of ALL.txt.
+# ---------------------------
+NGRAM_SIZE = 3
+
+def build_name_index(valid_hexes):
+    names = set(skin_name.lower() for skin_name in valid_hexes.values())
+    ngrams = {}
+    for name in names:
+        for i in range(len(name) - NGRAM_SIZE + 1):
+            ngrams.setdefault(name[i:i + NGRAM_SIZE], set()).add(name)
+    return {"names": names, "ngrams": ngrams, "cache": {}}
+
+# ---------------------------
+# Helper: Lowercased skin names excluded by a set of name exclusions.
+# A name is excluded when an exclusion contains it or it contains an exclusion.
+# Results are cached per exclusion set and reused by every file group sharing it.
+# ---------------------------
+def names_excluded_by(name_index, name_exclusions):
+    key = frozenset(name_exclusions)
+    cache = name_index["cache"]
+    if key in cache:
+        return cache[key]
+    names = name_index["names"]
+    ngrams = name_index["ngrams"]
+    excluded = set()
+    for excl in key:
+        # Names that contain the exclusion: intersect the posting sets of its trigrams.
+        if len(excl) >= NGRAM_SIZE:
+            grams = sorted((excl[i:i + NGRAM_SIZE] for i in range(len(excl) - NGRAM_SIZE + 1)),
+                           key=lambda g: len(ngrams.get(g, ())))
+            candidates = set(ngrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates &= ngrams.get(gram, set())
+        else:
+            candidates = names
+        excluded.update(name for name in candidates if excl in name)
+        # Names contained in the exclusion: look up each of its substrings.
+        for start in range(len(excl) + 1):
+            for end in range(start, len(excl) + 1):
+                if excl[start:end] in names:
+                    excluded.add(excl[start:end])
+    cache[key] = excluded
+    return excluded
+
+# ---------------------------
+# Helper: Null one repack file (runs in a worker process or thread).
+# Returns ({hex: occurrences nulled}, set of skin names excluded by name).
+# ---------------------------
+def null_repack_file(path, valid_hexes, unified_exclusions, excluded_names):
+    with open(path, "rb") as repack_file:
+        original_content = repack_file.read()
+    content = original_content
+    # Use a dictionary to record each nulled hex and its count.
+    nulled_hexes = {}
+    excluded_skin_names = set()
+    
+    # Collect each valid hex from ALL.txt that is not excluded.
+    candidates = []
+    for hex_code, skin_name in valid_hexes.items():
+        # Skip if the hex code is explicitly excluded.
+        if hex_code in unified_exclusions:
+            continue
+        # Also skip if the skin name matches any name exclusion (case-insensitive substring check).
+        if skin_name.lower() in excluded_names:
+            excluded_skin_names.add(skin_name)
+            continue
+        try:
+            candidates.append((hex_code, bytes.fromhex(hex_code)))
+        except ValueError:
+            continue
+    
+    # Protect every occurrence of an excluded hex value in the original content.
+    protected_spans = []
+    for ex in unified_exclusions:
+        try:
+            ex_bytes = bytes.fromhex(ex)
+        except ValueError:
+            continue
+        for pos in find_all_occurrences(original_content, ex_bytes):
+            protected_spans.append((pos, pos + len(ex_bytes)))
+    
+    # Find all candidates in one scan per hex width, then null them outside the protected spans.
+    hits = find_id_positions(content, [hex_bytes for _, hex_bytes in candidates])
+    for hex_code, hex_bytes in candidates:
+        occurrences = len(hits.get(hex_bytes, []))
+        if occurrences > 0:
+            nulled_hexes[hex_code] = occurrences
+    if hits:
+        content = null_id_positions(content, hits, protected_spans)
+    
+    # Write the final content back to file.
+    with open(path, "wb") as repack_file:
+        repack_file.write(content)
+    return nulled_hexes, excluded_skin_names
+
 # ---------------------------
 # Main Process
 # ---------------------------
-def process_changelog():
+def process_changelog(workers=WORKERS):
     # Read changelog file.
     changelog_path = os.path.join(REPACK_DIR, "changelog.txt")
     with open(changelog_path, "r", encoding="utf-8") as f:
@@ -82,7 +182,7 @@ def process_changelog():
     blocks = [block.strip() for block in changelog_content.split("==============================") if block.strip()]
     
     # Group modifications by repack file.
-    file_groups = {}  # key: repack filename; value: { path, content, hex_exclusions, index_exclusions, name_exclusions }
+    file_groups = {}  # key: repack filename; value: { path, hex_exclusions, index_exclusions, name_exclusions }
     for block in blocks:
         data = parse_changelog_block(block)
         if not data:
@@ -90,11 +190,10 @@ def process_changelog():
         repack_filename = data["repack_filename"]
         if repack_filename not in file_groups:
             repack_file_path = os.path.join(REPACK_DIR, repack_filename)
-            with open(repack_file_path, "rb") as repack_file:
-                content = repack_file.read()
+            if not os.path.isfile(repack_file_path):
+                raise FileNotFoundError(f"Repack file listed in changelog not found: {repack_file_path}")
             file_groups[repack_filename] = {
                 "path": repack_file_path,
-                "content": content,
                 "hex_exclusions": set(),
                 "index_exclusions": set(),
                 "name_exclusions": set()
@@ -104,59 +203,25 @@ def process_changelog():
         file_groups[repack_filename]["name_exclusions"].update(data["name_exclusions"])
     
     valid_hexes = load_valid_hexes()
+    name_index = build_name_index(valid_hexes)
     # For reporting: track name-based exclusions.
     name_based_exclusions = {}
 
     # Dictionary to record which hex values were nulled for each file (with counts).
     nulled_hexes_by_file = {}
     
+    # Null every file group in the worker pool; results come back in changelog order.
+    jobs = []
     for repack_filename, group in file_groups.items():
-        original_content = group["content"]  # Backup of original file content.
-        content = group["content"]
         unified_exclusions = group["hex_exclusions"].union(group["index_exclusions"])
-        total_replacements = 0
-        # Use a dictionary to record each nulled hex and its count.
-        nulled_hexes = {}
-        
-        # Process each valid hex from ALL.txt.
-        for hex_code, skin_name in valid_hexes.items():
-            # Skip if the hex code is explicitly excluded.
-            if hex_code in unified_exclusions:
-                continue
-            # Also skip if the skin name matches any name exclusion (case-insensitive substring check).
-            lower_skin_name = skin_name.lower()
-            skip_by_name = False
-            for excl in group["name_exclusions"]:
-                if excl in lower_skin_name or lower_skin_name in excl:
-                    skip_by_name = True
-                    name_based_exclusions.setdefault(repack_filename, set()).add(skin_name)
-                    break
-            if skip_by_name:
-                continue
-            try:
-                hex_bytes = bytes.fromhex(hex_code)
-            except ValueError:
-                continue
-            null_bytes = b'\x00' * len(hex_bytes)
-            occurrences = content.count(hex_bytes)
-            if occurrences > 0:
-                content = content.replace(hex_bytes, null_bytes)
-                total_replacements += occurrences
-                nulled_hexes[hex_code] = occurrences
-        
-        # Now, restore any excluded hex values from the original content.
-        for ex in unified_exclusions:
-            try:
-                ex_bytes = bytes.fromhex(ex)
-            except ValueError:
-                continue
-            positions = find_all_occurrences(original_content, ex_bytes)
-            for pos in positions:
-                content = content[:pos] + ex_bytes + content[pos+len(ex_bytes):]
-        
-        # Write the final content back to file.
-        with open(group["path"], "wb") as repack_file:
-            repack_file.write(content)
+        excluded_names = names_excluded_by(name_index, group["name_exclusions"])
+        jobs.append((group["path"], valid_hexes, unified_exclusions, excluded_names))
+    results = run_in_pool(null_repack_file, jobs, workers)
+    
+    for (repack_filename, group), (nulled_hexes, excluded_skin_names) in zip(file_groups.items(), results):
+        total_replacements = sum(nulled_hexes.values())
+        if excluded_skin_names:
+            name_based_exclusions[repack_filename] = excluded_skin_names
         
         # Save the nulled hex report for this file.
         nulled_hexes_by_file[repack_filename] = nulled_hexes
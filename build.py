@@ -0,0 +1,335 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import fnmatch
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from obb_tool import file_sha1
+from repak_obb import ORIGINAL_DIR, OUTPUT_DIR, REPACK_DIR, REPACK_PAK
+
+# ---------------------------
+# Paths (the same ones each script hard-codes)
+# ---------------------------
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FILES_OBB = "/storage/emulated/0/FILES_OBB"
+TXT_DIR = os.path.join(FILES_OBB, "TXT")
+ANY_ICON_TXT_DIR = os.path.join(FILES_OBB, "MOD_ANY ICON", "TXT")
+MANIFEST_FILE = os.path.join(FILES_OBB, ".build_manifest.json")
+# REPACK_OBB subfolders the stages write; the trailing separator marks them as folders
+ANY_ICON_REPACK_DIR = os.path.join(REPACK_DIR, "REPACKANYICON", "")
+DAT_REPACK_DIR = os.path.join(REPACK_DIR, "REPACK", "")
+SIZE_FIX_DIR = os.path.join(REPACK_DIR, "SIZEFIXGUN", "")
+SIZE_ICON_FIX_DIR = os.path.join(REPACK_DIR, "SIZEICONFIX", "")
+
+# ---------------------------
+# Stages
+# ---------------------------
+# Each stage runs one script. inputs/outputs are files, folders (hashed recursively)
+# or glob patterns (matching files directly in their folder). "exclude" lists files
+# left out of the input hash, such as an output kept inside an input folder. A stage
+# runs after every earlier stage whose outputs it reads or writes, and is skipped
+# while its inputs hash the same as after its last good run.
+# Interactive stages get the terminal and run one at a time; the others run
+# concurrently with captured output. Scripts run from SCRIPT_DIR, where they keep
+# their relative config and cache files (e.g. GOATED's directories.json).
+STAGES = [
+    {
+        "name": "GOATED",
+        "script": "GOATED.py",
+        "interactive": True,
+        "inputs": [os.path.join(TXT_DIR, "guns.txt"), os.path.join(TXT_DIR, "skin_index.txt"),
+                   os.path.join(FILES_OBB, "GUN_SKIN"), os.path.join(FILES_OBB, "HIT_EFFECT"),
+                   os.path.join(FILES_OBB, "LOOTBOX_DATS"), os.path.join(FILES_OBB, "ICON_MOD"),
+                   os.path.join(SCRIPT_DIR, "directories.json")],
+        # GOATED writes (and prunes) only the files directly in REPACK_OBB, not its subfolders.
+        "outputs": [os.path.join(REPACK_DIR, "*")],
+    },
+    {
+        "name": "MOD_SKIN",
+        "script": "MOD_SKIN.py",
+        "interactive": True,
+        "inputs": [ANY_ICON_TXT_DIR, os.path.join(FILES_OBB, "ICON_MOD")],
+        "outputs": [ANY_ICON_REPACK_DIR],
+    },
+    {
+        "name": "MOD_CAR",
+        "script": "MOD_CAR.py",
+        "interactive": True,
+        "inputs": [os.path.join(FILES_OBB, "MOD_CAR", "TXT"), os.path.join(FILES_OBB, "MOD_CAR", "DATS")],
+        "outputs": [DAT_REPACK_DIR],
+    },
+    {
+        "name": "MOD_LOBBY",
+        "script": "MOD_LOBBY.py",
+        "interactive": True,
+        "inputs": [os.path.join(FILES_OBB, "AUTO_THEME", "TXT"), os.path.join(FILES_OBB, "AUTO_THEME", "FILES")],
+        "outputs": [DAT_REPACK_DIR],
+    },
+    {
+        "name": "ADD_CREDIT",
+        "script": "ADD_CREDIT.py",
+        "interactive": True,
+        "inputs": [os.path.join(FILES_OBB, "CREDIT_MOD")],
+        "outputs": [DAT_REPACK_DIR],
+    },
+    {
+        "name": "SIZE_ISSUE_FIX",
+        "script": "SIZE_ISSUE_FIX.py",
+        "interactive": False,
+        "inputs": [os.path.join(TXT_DIR, "guns.txt"), os.path.join(TXT_DIR, "longhex.txt"),
+                   SIZE_FIX_DIR],
+        "outputs": [SIZE_FIX_DIR],
+    },
+    {
+        "name": "SIZE_ISSUE_ICON_FIX",
+        "script": "SIZE_ISSUE_ICON_FIX.py",
+        "interactive": False,
+        "inputs": [os.path.join(ANY_ICON_TXT_DIR, "ALL.txt"), SIZE_ICON_FIX_DIR],
+        "outputs": [SIZE_ICON_FIX_DIR],
+    },
+    {
+        "name": "REPAK",
+        "script": "repak_obb.py",
+        "interactive": False,
+        "inputs": [os.path.join(ORIGINAL_DIR, "*.obb"), REPACK_DIR],
+        # The rebuilt pak lives in REPACK_OBB but is not one of the modified files.
+        "exclude": [REPACK_PAK],
+        "outputs": [REPACK_PAK, os.path.join(OUTPUT_DIR, "*.obb")],
+    },
+]
+
+# ---------------------------
+# Hashing
+# ---------------------------
+def expand_path(path):
+    """Files under path: itself, everything below a folder, or the files a glob matches."""
+    if glob.has_magic(path):
+        return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+    if os.path.isdir(path):
+        files = []
+        for root, _, names in os.walk(path):
+            files.extend(os.path.join(root, name) for name in names)
+        return sorted(files)
+    return [path] if os.path.isfile(path) else []
+
+def cached_sha1(path, file_hashes):
+    """SHA1 of a file, reusing the recorded value while its size and mtime are unchanged."""
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    record = file_hashes.get(key)
+    if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+        return record["sha1"]
+    sha1 = file_sha1(path)
+    file_hashes[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1}
+    return sha1
+
+def fingerprint(paths, file_hashes, exclude=()):
+    """One hash over the names and contents of every file the paths cover (missing paths included)."""
+    skipped = {MANIFEST_FILE} | {os.path.abspath(path) for path in exclude}
+    digest = hashlib.sha1()
+    for path in paths:
+        files = [p for p in expand_path(path) if os.path.abspath(p) not in skipped]
+        digest.update(f"{path}\0{len(files)}\n".encode())
+        for file_path in files:
+            digest.update(f"{file_path}\0{cached_sha1(file_path, file_hashes)}\n".encode())
+    return digest.hexdigest()
+
+def stage_fingerprint(stage, file_hashes):
+    return fingerprint(stage["inputs"], file_hashes, stage.get("exclude", ()))
+
+def outputs_exist(stage):
+    return all(glob.glob(path) if glob.has_magic(path) else os.path.exists(path) for path in stage["outputs"])
+
+def load_manifest():
+    if os.path.exists(MANIFEST_FILE):
+        try:
+            with open(MANIFEST_FILE, "r") as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict):
+                manifest.setdefault("files", {})
+                manifest.setdefault("stages", {})
+                return manifest
+        except (ValueError, OSError):
+            pass
+    return {"files": {}, "stages": {}}
+
+def save_manifest(manifest):
+    manifest["files"] = {path: record for path, record in manifest["files"].items() if os.path.exists(path)}
+    os.makedirs(os.path.dirname(MANIFEST_FILE), exist_ok=True)
+    with open(MANIFEST_FILE + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(MANIFEST_FILE + ".tmp", MANIFEST_FILE)
+
+# ---------------------------
+# Planning
+# ---------------------------
+def _inside(path, folder):
+    return path == folder or path.startswith(folder + os.sep)
+
+def _overlaps(a, b):
+    """
+    True when two declared paths can cover the same file: one lies inside the other,
+    or a path in a glob's folder matches it. A glob covers only files directly in its
+    folder, so an existing subfolder there (or a path declared with a trailing
+    separator) does not overlap it.
+    """
+    if glob.has_magic(b) and not glob.has_magic(a):
+        a, b = b, a
+    if not glob.has_magic(a):
+        return _inside(os.path.abspath(a), os.path.abspath(b)) or _inside(os.path.abspath(b), os.path.abspath(a))
+    folder, pattern = os.path.split(os.path.abspath(a))
+    if glob.has_magic(b):
+        return folder == os.path.abspath(os.path.dirname(b))
+    path = os.path.abspath(b)
+    if _inside(folder, path):
+        return True
+    is_folder = b.endswith(os.sep) or os.path.isdir(path)
+    return os.path.dirname(path) == folder and not is_folder and fnmatch.fnmatch(os.path.basename(path), pattern)
+
+def stage_dependencies(stages):
+    """
+    {stage name: [earlier stage names]} where a stage depends on every earlier stage
+    whose outputs it reads or writes, or whose inputs it writes.
+    """
+    deps = {}
+    for i, stage in enumerate(stages):
+        deps[stage["name"]] = []
+        for earlier in stages[:i]:
+            touches = any(_overlaps(path, out) for path in stage["inputs"] + stage["outputs"]
+                          for out in earlier["outputs"])
+            touches = touches or any(_overlaps(out, path) for out in stage["outputs"] for path in earlier["inputs"])
+            if touches:
+                deps[stage["name"]].append(earlier["name"])
+    return deps
+
+def is_up_to_date(stage, manifest):
+    record = manifest["stages"].get(stage["name"])
+    if not record or not outputs_exist(stage):
+        return False
+    return record["inputs"] == stage_fingerprint(stage, manifest["files"])
+
+# ---------------------------
+# Running
+# ---------------------------
+def run_stage(stage):
+    """Run a stage's script; returns (exit code, captured output or None)."""
+    command = [sys.executable, os.path.join(SCRIPT_DIR, stage["script"])]
+    if stage["interactive"]:
+        return subprocess.run(command, cwd=SCRIPT_DIR).returncode, None
+    result = subprocess.run(command, cwd=SCRIPT_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, errors="replace")
+    return result.returncode, result.stdout
+
+def finish_stage(stage, code, output, started, manifest, failed):
+    if output:
+        print(f"\n----- {stage['name']} output -----\n{output.rstrip()}\n----- end of {stage['name']} -----")
+    elapsed = time.monotonic() - started
+    if code == 0:
+        manifest["stages"][stage["name"]] = {"inputs": stage_fingerprint(stage, manifest["files"]),
+                                             "finished": time.strftime("%Y-%m-%d %H:%M:%S")}
+        save_manifest(manifest)
+        print(f"✅ {stage['name']} finished in {elapsed:.1f}s")
+    else:
+        failed.add(stage["name"])
+        print(f"❌ {stage['name']} failed with exit code {code} after {elapsed:.1f}s")
+
+def build(stages=STAGES, force=(), dry_run=False, workers=None):
+    """
+    Run every stage that is stale or named in force, in dependency order; a stage
+    whose dependency ran is rerun too, so a dry run shows exactly the plan a real run
+    follows. Independent non-interactive stages run concurrently (up to workers at a
+    time), also while an interactive stage runs. Returns the set of stages that failed (stages depending on them are not run).
+    """
+    deps = stage_dependencies(stages)
+    manifest = load_manifest()
+    pending = list(stages)
+    finished, failed, ran = set(), set(), set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        while pending or running:
+            progressed = False
+            # Captured stages start first so they run in the background while an interactive one has the terminal
+            for stage in sorted(pending, key=lambda s: s["interactive"]):
+                name = stage["name"]
+                if any(dep in failed for dep in deps[name]):
+                    pending.remove(stage)
+                    failed.add(name)
+                    print(f"⏭️ {name} not run: depends on a failed stage")
+                    progressed = True
+                    continue
+                if not all(dep in finished for dep in deps[name]):
+                    continue
+                stale_deps = any(dep in ran for dep in deps[name])
+                if name not in force and not stale_deps and is_up_to_date(stage, manifest):
+                    pending.remove(stage)
+                    finished.add(name)
+                    print(f"✔️ {name} is up to date")
+                    progressed = True
+                    continue
+                if dry_run:
+                    pending.remove(stage)
+                    finished.add(name)
+                    ran.add(name)
+                    print(f"🔧 {name} would run")
+                    progressed = True
+                    continue
+                if stage["interactive"]:
+                    pending.remove(stage)
+                    print(f"\n▶️ Running {name} (interactive)")
+                    started = time.monotonic()
+                    code, output = run_stage(stage)
+                    finish_stage(stage, code, output, started, manifest, failed)
+                    ran.add(name)
+                    if code == 0:
+                        finished.add(name)
+                    progressed = True
+                    break
+                pending.remove(stage)
+                print(f"▶️ Running {name}")
+                running[pool.submit(run_stage, stage)] = (stage, time.monotonic())
+                progressed = True
+            if progressed:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, started = running.pop(future)
+                code, output = future.result()
+                finish_stage(stage, code, output, started, manifest, failed)
+                ran.add(stage["name"])
+                if code == 0:
+                    finished.add(stage["name"])
+    return failed
+
+def build_parser():
+    names = [stage["name"] for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Build the final OBB from the mod sources, rerunning only stale stages.")
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"stages to rerun even if up to date ({', '.join(names)})")
+    parser.add_argument("--force", action="store_true", help="rerun every stage")
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would run")
+    parser.add_argument("--workers", type=int, help="concurrent non-interactive stages (default: CPU count)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = set(args.stages) - {stage["name"] for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    force = {stage["name"] for stage in STAGES} if args.force else set(args.stages)
+    print("=== STARTING BUILD ===")
+    failed = build(STAGES, force, args.dry_run, args.workers)
+    if failed:
+        print(f"=== Build failed: {', '.join(sorted(failed))} ===")
+        return 1
+    print("=== Build complete ===")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# NumPy is optional: without it the pure-Python scan below is used.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Files smaller than this are scanned with bytes.find; NumPy setup costs more than it saves.
+NUMPY_MIN_SIZE = 64 * 1024
+# Number of positions processed per chunk in the unaligned NumPy path (bounds memory use).
+CHUNK_POSITIONS = 4 * 1024 * 1024
+# Default number of parallel workers for per-file jobs.
+WORKERS = os.cpu_count() or 1
+# Set OBB_NO_NUMPY=1 to force the pure-Python scan.
+USE_NUMPY = np is not None and not os.environ.get("OBB_NO_NUMPY")
+
+# ---------------------------
+# Helper: Pure-Python scan of one ID.
+# ---------------------------
+def _python_positions(data, id_bytes):
+    positions = []
+    pos = data.find(id_bytes)
+    while pos != -1:
+        positions.append(pos)
+        pos = data.find(id_bytes, pos + 1)
+    return positions
+
+# ---------------------------
+# Helper: NumPy scan of IDs that all share one byte width.
+# ---------------------------
+def _numpy_key(id_bytes):
+    # Little-endian integer of the first 8 bytes, matching the views below.
+    return int.from_bytes(id_bytes[:8], "little")
+
+def _numpy_positions(data, ids):
+    """
+    Return {id: [positions]} for IDs of one width, using sorted-key lookups.
+    Widths 2, 4 and 8 view the file as unsigned integers at each byte alignment;
+    other widths build the keys with shifted ORs. IDs longer than 8 bytes are
+    matched on their first 8 bytes and verified in Python.
+    """
+    width = len(ids[0])
+    key_width = min(width, 8)
+    by_key = {}
+    for id_bytes in ids:
+        by_key.setdefault(_numpy_key(id_bytes), []).append(id_bytes)
+    dtype = np.uint64
+    sorted_keys = np.array(sorted(by_key), dtype=dtype)
+
+    arr = np.frombuffer(data, dtype=np.uint8)
+    n = len(arr)
+    hits = {id_bytes: [] for id_bytes in ids}
+
+    def record(positions, keys):
+        for pos, key in zip(positions.tolist(), keys.tolist()):
+            for id_bytes in by_key[key]:
+                if key_width == width or data[pos:pos + width] == id_bytes:
+                    hits[id_bytes].append(pos)
+
+    if key_width in (2, 4, 8):
+        # Search the file's own integer view (no widened copy), a chunk of positions at a time.
+        view_dtype = np.dtype("<u%d" % key_width)
+        native_keys = sorted_keys.astype(view_dtype)
+        for alignment in range(key_width):
+            count = (n - alignment) // key_width
+            for first in range(0, count, CHUNK_POSITIONS):
+                start = alignment + first * key_width
+                stop = alignment + min(first + CHUNK_POSITIONS, count) * key_width
+                view = arr[start:stop].view(view_dtype)
+                slots = np.searchsorted(native_keys, view)
+                slots[slots == len(native_keys)] = 0
+                found = np.nonzero(native_keys[slots] == view)[0]
+                positions = start + found * key_width
+                # An ID longer than the key must still fit in the file
+                keep = positions + width <= n
+                record(positions[keep], view[found][keep])
+    else:
+        last = n - key_width + 1
+        for start in range(0, max(last, 0), CHUNK_POSITIONS):
+            stop = min(start + CHUNK_POSITIONS, last)
+            keys = np.zeros(stop - start, dtype=dtype)
+            for j in range(key_width):
+                keys |= arr[start + j:stop + j].astype(dtype) << dtype(8 * j)
+            slots = np.searchsorted(sorted_keys, keys)
+            slots[slots == len(sorted_keys)] = 0
+            found = np.nonzero(sorted_keys[slots] == keys)[0]
+            positions = start + found
+            keep = positions + width <= n
+            record(positions[keep], keys[found][keep])
+
+    for id_bytes in hits:
+        hits[id_bytes].sort()
+    return hits
+
+# ---------------------------
+# Main API
+# ---------------------------
+def find_id_positions(data, ids):
+    """
+    Find every ID of a list in data with one scan per ID width.
+    Returns {id_bytes: [positions]} for the IDs that were found.
+
+    The hits are exactly what sequential data.replace(id, nulls) calls in list
+    order would null: each ID is matched against the buffer with every earlier
+    ID already nulled, so an earlier ID can hide a match or, when the ID
+    contains 00 bytes, create one. Such IDs are rescanned in the nulled buffer.
+    """
+    ids = list(dict.fromkeys(i for i in ids if i))
+    by_width = {}
+    for id_bytes in ids:
+        by_width.setdefault(len(id_bytes), []).append(id_bytes)
+
+    raw = {}
+    for width, group in by_width.items():
+        if USE_NUMPY and len(data) >= NUMPY_MIN_SIZE and width > 1:
+            raw.update(_numpy_positions(data, group))
+        else:
+            for id_bytes in group:
+                raw[id_bytes] = _python_positions(data, id_bytes)
+
+    nulled = bytearray(data)
+    hits = {}
+    for id_bytes in ids:
+        width = len(id_bytes)
+        if hits and b"\x00" in id_bytes:
+            # Nulling may have created matches the scan of the original data missed
+            candidates = _python_positions(nulled, id_bytes)
+        else:
+            candidates = raw.get(id_bytes, [])
+        kept = []
+        end = 0
+        for pos in candidates:
+            # replace() takes non-overlapping matches left to right
+            if pos < end or nulled[pos:pos + width] != id_bytes:
+                continue
+            kept.append(pos)
+            end = pos + width
+        if kept:
+            null_bytes = b"\x00" * width
+            for pos in kept:
+                nulled[pos:pos + width] = null_bytes
+            hits[id_bytes] = kept
+    return hits
+
+def null_id_positions(data, hits, protected_spans=()):
+    """
+    Return a copy of data with every hit from find_id_positions replaced by null bytes.
+    Bytes inside protected_spans ((start, end) pairs) keep their original value.
+    """
+    out = bytearray(data)
+    for id_bytes, positions in hits.items():
+        null_bytes = b"\x00" * len(id_bytes)
+        for pos in positions:
+            out[pos:pos + len(id_bytes)] = null_bytes
+    if protected_spans:
+        source = memoryview(data)
+        for start, end in protected_spans:
+            out[start:end] = source[start:end]
+    return bytes(out)
+
+# ---------------------------
+# Worker pool for independent per-file jobs
+# ---------------------------
+def run_in_pool(func, jobs, workers):
+    """
+    Run func(*args) for every args tuple in jobs and return the results in job order.
+    Uses a process pool when the platform supports one (Termux/Android lacks sem_open),
+    otherwise a thread pool; workers <= 1 runs the jobs serially.
+    """
+    jobs = list(jobs)
+    if workers <= 1 or len(jobs) <= 1:
+        return [func(*args) for args in jobs]
+    workers = min(workers, len(jobs))
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (ImportError, NotImplementedError, OSError):
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        futures = [pool.submit(func, *args) for args in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,821 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import zlib
+
+# ---------------------------
+# Zip record layouts
+# ---------------------------
+EOCD_SIG = b"PK\x05\x06"
+ZIP64_EOCD_SIG = b"PK\x06\x06"
+ZIP64_LOCATOR_SIG = b"PK\x06\x07"
+CD_SIG = b"PK\x01\x02"
+
+EOCD_STRUCT = struct.Struct("<4s4H2LH")
+ZIP64_LOCATOR_STRUCT = struct.Struct("<4sLQL")
+ZIP64_EOCD_STRUCT = struct.Struct("<4sQ2H2L4Q")
+CD_STRUCT = struct.Struct("<4s6H3L5H2L")
+LOCAL_STRUCT = struct.Struct("<4s5H3L2H")
+LOCAL_SIG = b"PK\x03\x04"
+DESCRIPTOR_SIG = b"PK\x07\x08"
+
+# Extra-field ID used for padding (the one zipalign uses); readers skip unknown IDs.
+PAD_EXTRA_ID = 0xD935
+ZIP64_EXTRA_ID = 0x0001
+MAX_FIELD = 0xFFFF
+# Largest possible EOCD search window: the record plus a maximum-length comment.
+EOCD_SEARCH = EOCD_STRUCT.size + MAX_FIELD
+# Compression methods handled by extract.
+STORED, DEFLATED = 0, 8
+# Read size for streamed copies and decompression.
+COPY_CHUNK = 1024 * 1024
+# Bytes per sendfile call (also how often copy progress is reported).
+SENDFILE_CHUNK = 64 * 1024 * 1024
+# Member that holds the game's pak inside the OBB.
+PAK_MEMBER = "ShadowTrackerExtra/Content/Paks/mini_obb.pak"
+# Manifest of the pristine-unpack cache (inside the cache directory).
+CACHE_FILE = "cache.json"
+# ioctl that clones a file's extents (reflink) on Btrfs/XFS and similar.
+FICLONE = 0x40049409
+
+
+class ZipLayoutError(Exception):
+    """Raised when the archive's end records cannot be parsed."""
+
+
+# ---------------------------
+# Helpers: zip structure parsing
+# ---------------------------
+def parse_extra(extra):
+    """Split an extra field into a list of (header_id, data) blocks."""
+    blocks = []
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<2H", extra, pos)
+        blocks.append((header_id, extra[pos + 4:pos + 4 + length]))
+        pos += 4 + length
+    return blocks
+
+def build_extra(blocks):
+    return b"".join(struct.pack("<2H", header_id, len(data)) + data for header_id, data in blocks)
+
+def read_zip_layout(f):
+    """
+    Locate the end records of an open zip file.
+    Returns a dict with the EOCD fields, its offset and comment, the zip64 records
+    (or None), and "trailing": bytes after the EOCD comment (e.g. from blind padding).
+    """
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    start = max(0, size - EOCD_SEARCH - 4096)
+    f.seek(start)
+    tail = f.read()
+    pos = tail.rfind(EOCD_SIG)
+    while pos != -1:
+        if pos + EOCD_STRUCT.size <= len(tail):
+            fields = EOCD_STRUCT.unpack_from(tail, pos)
+            comment_len = fields[7]
+            if pos + EOCD_STRUCT.size + comment_len <= len(tail):
+                break
+        pos = tail.rfind(EOCD_SIG, 0, pos)
+    if pos == -1:
+        raise ZipLayoutError("end of central directory record not found")
+
+    _, _, _, _, entries, cd_size, cd_offset, comment_len = fields
+    eocd_offset = start + pos
+    comment_start = pos + EOCD_STRUCT.size
+    layout = {
+        "size": size,
+        "eocd_offset": eocd_offset,
+        "eocd_fields": list(fields),
+        "comment": tail[comment_start:comment_start + comment_len],
+        "trailing": size - (eocd_offset + EOCD_STRUCT.size + comment_len),
+        "entries": entries,
+        "cd_offset": cd_offset,
+        "cd_size": cd_size,
+        "zip64": None,
+    }
+
+    locator_offset = eocd_offset - ZIP64_LOCATOR_STRUCT.size
+    if locator_offset >= 0:
+        f.seek(locator_offset)
+        locator = f.read(ZIP64_LOCATOR_STRUCT.size)
+        if locator.startswith(ZIP64_LOCATOR_SIG):
+            _, _, zip64_offset, _ = ZIP64_LOCATOR_STRUCT.unpack(locator)
+            f.seek(zip64_offset)
+            head = f.read(ZIP64_EOCD_STRUCT.size)
+            if len(head) < ZIP64_EOCD_STRUCT.size or not head.startswith(ZIP64_EOCD_SIG):
+                raise ZipLayoutError("zip64 end of central directory record not found")
+            record_fields = list(ZIP64_EOCD_STRUCT.unpack(head))
+            extensible = f.read(record_fields[1] + 12 - ZIP64_EOCD_STRUCT.size)
+            layout["zip64"] = {
+                "offset": zip64_offset,
+                "fields": record_fields,
+                "extensible": extensible,
+                "locator_fields": list(ZIP64_LOCATOR_STRUCT.unpack(locator)),
+            }
+            layout["entries"] = record_fields[7]
+            layout["cd_size"] = record_fields[8]
+            layout["cd_offset"] = record_fields[9]
+    return layout
+
+def entry_info(entry):
+    """Decoded filename, method, CRC, sizes and local header offset of a central directory entry."""
+    fields = entry["fields"]
+    flags, method, crc = fields[3], fields[4], fields[7]
+    compressed_size, file_size, local_offset = fields[8], fields[9], fields[16]
+    # Saturated values are stored, in this order, in the zip64 extra block.
+    for header_id, data in parse_extra(entry["extra"]):
+        if header_id != ZIP64_EXTRA_ID:
+            continue
+        values = list(struct.unpack_from("<%dQ" % (len(data) // 8), data))
+        if file_size == 0xFFFFFFFF and values:
+            file_size = values.pop(0)
+        if compressed_size == 0xFFFFFFFF and values:
+            compressed_size = values.pop(0)
+        if local_offset == 0xFFFFFFFF and values:
+            local_offset = values.pop(0)
+    filename = entry["name"].decode("utf-8" if flags & 0x800 else "cp437")
+    return {
+        "filename": filename,
+        "flags": flags,
+        "method": method,
+        "crc": crc,
+        "compressed_size": compressed_size,
+        "file_size": file_size,
+        "local_offset": local_offset,
+    }
+
+def read_central_directory(f, layout):
+    """Parse every central directory entry into a dict (raw header fields, name, extra, comment)."""
+    f.seek(layout["cd_offset"])
+    data = f.read(layout["cd_size"])
+    entries = []
+    pos = 0
+    while pos + CD_STRUCT.size <= len(data) and data.startswith(CD_SIG, pos):
+        fields = list(CD_STRUCT.unpack_from(data, pos))
+        name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+        pos += CD_STRUCT.size
+        name = data[pos:pos + name_len]
+        extra = data[pos + name_len:pos + name_len + extra_len]
+        comment = data[pos + name_len + extra_len:pos + name_len + extra_len + comment_len]
+        pos += name_len + extra_len + comment_len
+        entry = {"fields": fields, "name": name, "extra": extra, "comment": comment}
+        entry.update(entry_info(entry))
+        entries.append(entry)
+    if len(entries) != layout["entries"]:
+        raise ZipLayoutError(f"central directory lists {len(entries)} entries, end record says {layout['entries']}")
+    return entries
+
+def pack_cd_entry(entry):
+    fields = list(entry["fields"])
+    fields[10], fields[11], fields[12] = len(entry["name"]), len(entry["extra"]), len(entry["comment"])
+    return CD_STRUCT.pack(*fields) + entry["name"] + entry["extra"] + entry["comment"]
+
+def pack_end_records(layout, cd_offset, cd_size, comment):
+    """Build the (zip64 EOCD + locator +) EOCD bytes for a central directory at cd_offset."""
+    out = b""
+    zip64 = layout["zip64"]
+    if zip64:
+        record = list(zip64["fields"])
+        record[8], record[9] = cd_size, cd_offset
+        out += ZIP64_EOCD_STRUCT.pack(*record) + zip64["extensible"]
+        locator = list(zip64["locator_fields"])
+        locator[2] = cd_offset + cd_size
+        out += ZIP64_LOCATOR_STRUCT.pack(*locator)
+    fields = list(layout["eocd_fields"])
+    # Fields saturated at 0xFFFFFFFF defer to the zip64 record.
+    if fields[5] != 0xFFFFFFFF:
+        fields[5] = cd_size
+    if fields[6] != 0xFFFFFFFF:
+        fields[6] = cd_offset
+    fields[7] = len(comment)
+    return out + EOCD_STRUCT.pack(*fields) + comment
+
+def find_member(entries, name):
+    """Return the central directory entry for name (case-sensitive, '/' separated)."""
+    name = name.replace("\\", "/").lstrip("/")
+    for entry in entries:
+        if entry["filename"] == name:
+            return entry
+    raise KeyError(f"{name} not found in archive")
+
+def read_local_header(f, entry):
+    """Return (header fields, name, extra, data offset) of a member's local file header."""
+    f.seek(entry["local_offset"])
+    header = f.read(LOCAL_STRUCT.size)
+    if len(header) < LOCAL_STRUCT.size or not header.startswith(LOCAL_SIG):
+        raise ZipLayoutError(f"bad local header for {entry['filename']}")
+    fields = list(LOCAL_STRUCT.unpack(header))
+    name = f.read(fields[9])
+    extra = f.read(fields[10])
+    return fields, name, extra, entry["local_offset"] + LOCAL_STRUCT.size + fields[9] + fields[10]
+
+def member_data_offset(f, entry):
+    """Return the offset of a member's data, read from its local file header."""
+    return read_local_header(f, entry)[3]
+
+def member_end(f, entry):
+    """Return the offset just past a member: its data and, with flag bit 3, its data descriptor."""
+    end = member_data_offset(f, entry) + entry["compressed_size"]
+    if entry["flags"] & 0x8:
+        f.seek(end)
+        wide = entry["compressed_size"] >= 0xFFFFFFFF or entry["file_size"] >= 0xFFFFFFFF
+        end += (20 if wide else 12) + (4 if f.read(4) == DESCRIPTOR_SIG else 0)
+    return end
+
+def pack_local_header(fields, name, extra):
+    fields = list(fields)
+    fields[9], fields[10] = len(name), len(extra)
+    return LOCAL_STRUCT.pack(*fields) + name + extra
+
+def set_entry_location(entry, file_size, compressed_size, local_offset):
+    """
+    Store a central directory entry's sizes and local header offset.
+    Values that do not fit in 32 bits go to a rebuilt zip64 extra block.
+    """
+    fields = entry["fields"]
+    zip64_values = []
+    for index, value in ((9, file_size), (8, compressed_size), (16, local_offset)):
+        if value >= 0xFFFFFFFF:
+            fields[index] = 0xFFFFFFFF
+            zip64_values.append(value)
+        else:
+            fields[index] = value
+    blocks = [b for b in parse_extra(entry["extra"]) if b[0] != ZIP64_EXTRA_ID]
+    if zip64_values:
+        blocks.insert(0, (ZIP64_EXTRA_ID, struct.pack("<%dQ" % len(zip64_values), *zip64_values)))
+        fields[2] = max(fields[2], 45)
+    entry["extra"] = build_extra(blocks)
+    entry.update(entry_info(entry))
+
+def set_entry_values(entry, crc, size, local_offset):
+    """Point a central directory entry at a stored member of size bytes at local_offset."""
+    fields = entry["fields"]
+    # Stored, no data descriptor.
+    fields[3] &= ~0x8
+    fields[4] = STORED
+    fields[7] = crc
+    set_entry_location(entry, size, size, local_offset)
+
+def member_range(f, entry):
+    """
+    Return (offset, length) of a stored member's bytes in the archive, so it can be
+    read, mmapped or sent without going through the zip layer.
+    """
+    if entry["method"] != STORED:
+        raise ValueError(f"{entry['filename']} is compressed (method {entry['method']}), not stored")
+    return member_data_offset(f, entry), entry["compressed_size"]
+
+# ---------------------------
+# Member extraction
+# ---------------------------
+def copy_range(src, dst, offset, length, progress=None):
+    """
+    Copy length bytes at offset from src to dst (open files), using sendfile when available.
+    progress, if given, is called as progress(bytes done, length).
+    """
+    dst.flush()
+    start = dst.tell()
+    if hasattr(os, "sendfile"):
+        try:
+            sent = 0
+            while sent < length:
+                count = os.sendfile(dst.fileno(), src.fileno(), offset + sent, min(length - sent, SENDFILE_CHUNK))
+                if count == 0:
+                    break
+                sent += count
+                if progress:
+                    progress(sent, length)
+            if sent == length:
+                dst.seek(start + length)
+                return
+        except OSError:
+            pass
+        # Fall back to a plain copy of the whole range.
+        dst.seek(start)
+        dst.truncate()
+    src.seek(offset)
+    remaining = length
+    while remaining:
+        chunk = src.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            raise ZipLayoutError("archive ends inside member data")
+        dst.write(chunk)
+        remaining -= len(chunk)
+        if progress:
+            progress(length - remaining, length)
+
+def inflate_range(src, dst, offset, length, progress=None):
+    """Stream-decompress a deflated member into dst; returns the CRC32 of the output."""
+    src.seek(offset)
+    inflater = zlib.decompressobj(-15)
+    crc = 0
+    remaining = length
+    while remaining:
+        chunk = src.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            raise ZipLayoutError("archive ends inside member data")
+        remaining -= len(chunk)
+        out = inflater.decompress(chunk)
+        crc = zlib.crc32(out, crc)
+        dst.write(out)
+        if progress:
+            progress(length - remaining, length)
+    out = inflater.flush()
+    crc = zlib.crc32(out, crc)
+    dst.write(out)
+    return crc
+
+def extract_member(zip_path, name, dest_dir, progress=None):
+    """
+    Extract one member to dest_dir/<member path> without touching the rest of the archive.
+    Stored members are copied as a byte range (sendfile); deflated ones are streamed
+    through zlib and CRC-checked. Returns the output path.
+    """
+    with open(zip_path, "rb") as f:
+        layout = read_zip_layout(f)
+        entry = find_member(read_central_directory(f, layout), name)
+        offset = member_data_offset(f, entry)
+        out_path = os.path.join(dest_dir, *entry["filename"].split("/"))
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(out_path, "wb") as out:
+            if entry["method"] == STORED:
+                copy_range(f, out, offset, entry["compressed_size"], progress)
+            elif entry["method"] == DEFLATED:
+                crc = inflate_range(f, out, offset, entry["compressed_size"], progress)
+                if crc != entry["crc"]:
+                    raise ZipLayoutError(f"CRC mismatch in {entry['filename']}")
+            else:
+                raise ZipLayoutError(f"unsupported compression method {entry['method']} for {entry['filename']}")
+    return out_path
+
+# ---------------------------
+# Pristine unpack cache
+# ---------------------------
+def iter_file(path, progress=None):
+    """Yield a file's contents in COPY_CHUNK pieces, reporting progress(bytes read, size)."""
+    size = os.path.getsize(path)
+    done = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b""):
+            done += len(chunk)
+            yield chunk
+            if progress:
+                progress(done, size)
+
+def file_sha1(path, progress=None):
+    sha1 = hashlib.sha1()
+    for chunk in iter_file(path, progress):
+        sha1.update(chunk)
+    return sha1.hexdigest()
+
+def file_crc32(path, progress=None):
+    crc = 0
+    for chunk in iter_file(path, progress):
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+def load_cache(cache_dir):
+    path = os.path.join(cache_dir, CACHE_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                cache = json.load(f)
+            if isinstance(cache, dict):
+                cache.setdefault("originals", {})
+                cache.setdefault("unpacked", {})
+                return cache
+        except (ValueError, OSError):
+            pass
+    return {"originals": {}, "unpacked": {}}
+
+def save_cache(cache_dir, cache):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, CACHE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def clone_file(src, dst, writable=True, progress=None):
+    """
+    Make dst a copy of src as cheaply as possible: a reflink (copy-on-write clone) where
+    the filesystem supports it, else a hardlink when dst is only read (writable=False),
+    else a real copy. Files that will be modified never share storage with src.
+    Returns "reflink", "hardlink" or "copy".
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        import fcntl
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return "reflink"
+    except (ImportError, OSError):
+        if os.path.exists(dst):
+            os.remove(dst)
+    if not writable:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        copy_range(s, d, 0, os.path.getsize(src), progress)
+    return "copy"
+
+def original_sha1(cache, obb_path, progress=None):
+    """SHA1 of the original OBB, reusing the cached value while its size and mtime are unchanged."""
+    stat = os.stat(obb_path)
+    key = os.path.abspath(obb_path)
+    record = cache["originals"].get(key)
+    if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+        return record["sha1"]
+    sha1 = file_sha1(obb_path, progress)
+    cache["originals"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1}
+    return sha1
+
+def cached_member(obb_path, cache_dir, member=PAK_MEMBER, verify=False, progress=None):
+    """
+    Return (path, reused) for a pristine copy of member from the original OBB, kept in
+    cache_dir/<OBB sha1>/ and extracted only when the OBB's hash changes.
+    A cached file is reused while its size and mtime match the manifest (and, with
+    verify, its CRC32 matches the zip entry); otherwise it is extracted again.
+    Cache directories no longer referenced by any original are removed.
+    """
+    cache = load_cache(cache_dir)
+    sha1 = original_sha1(cache, obb_path, progress)
+    unpacked = cache["unpacked"].setdefault(sha1, {})
+    record = unpacked.get(member)
+    path = os.path.join(cache_dir, sha1, *member.split("/"))
+    reused = False
+    if record and os.path.exists(path):
+        stat = os.stat(path)
+        reused = stat.st_size == record["file_size"] and stat.st_mtime_ns == record["mtime_ns"]
+        if reused and verify:
+            reused = file_crc32(path, progress) == record["crc"]
+    if not reused:
+        if os.path.exists(path):
+            os.remove(path)
+        with open(obb_path, "rb") as f:
+            layout = read_zip_layout(f)
+            entry = find_member(read_central_directory(f, layout), member)
+            offset = member_data_offset(f, entry)
+        extract_member(obb_path, member, os.path.join(cache_dir, sha1), progress)
+        if file_crc32(path, progress) != entry["crc"]:
+            raise ZipLayoutError(f"CRC mismatch in {member} extracted from {obb_path}")
+        # Keep the cached copy read-only so hardlinks to it cannot be written through by mistake.
+        os.chmod(path, 0o444)
+        stat = os.stat(path)
+        unpacked[member] = {
+            "offset": offset,
+            "length": entry["compressed_size"],
+            "crc": entry["crc"],
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    live = {record["sha1"] for record in cache["originals"].values()}
+    for old in [key for key in cache["unpacked"] if key not in live]:
+        shutil.rmtree(os.path.join(cache_dir, old), ignore_errors=True)
+        del cache["unpacked"][old]
+    save_cache(cache_dir, cache)
+    return path, reused
+
+# ---------------------------
+# Member replacement
+# ---------------------------
+def write_file_at(f, src_path, offset, progress=None):
+    """Copy src_path into the open archive at offset; returns (crc32, size)."""
+    f.seek(offset)
+    crc = 0
+    size = 0
+    for chunk in iter_file(src_path, progress):
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        f.write(chunk)
+    return crc, size
+
+def zero_fill(f, start, end):
+    f.seek(start)
+    while start < end:
+        count = min(COPY_CHUNK, end - start)
+        f.write(b"\x00" * count)
+        start += count
+
+def move_range(f, src, dst, length):
+    """Move length bytes of an open file from offset src to offset dst; the ranges may overlap."""
+    if src == dst or not length:
+        return
+    # Copy front to back when moving down, back to front when moving up, so no byte is read after it is overwritten.
+    starts = range(0, length, COPY_CHUNK)
+    for start in (starts if dst < src else reversed(starts)):
+        count = min(COPY_CHUNK, length - start)
+        f.seek(src + start)
+        chunk = f.read(count)
+        if len(chunk) != count:
+            raise ZipLayoutError("archive ends inside member data")
+        f.seek(dst + start)
+        f.write(chunk)
+
+def shift_members(f, entries, start, end, shift):
+    """
+    Move the members stored in [start, end) by shift bytes and point their central
+    directory entries at the new local header offsets. Local headers hold no offsets,
+    so the moved bytes need no other change.
+    """
+    move_range(f, start, start + shift, end - start)
+    for entry in entries:
+        if start <= entry["local_offset"] < end:
+            set_entry_location(entry, entry["file_size"], entry["compressed_size"], entry["local_offset"] + shift)
+
+def replace_member(zip_path, name, src_path, progress=None):
+    """
+    Replace one member of the archive with the contents of src_path, stored uncompressed.
+    If the new data fits the member's slot (up to the next local header, or anywhere when
+    it is the last member) it is overwritten in place and the rest of the slot is zeroed;
+    otherwise the members after it are moved up by exactly the missing bytes, as
+    zip -u would, so the archive only grows by the real difference. Either way the
+    local header is rewritten with the new CRC/sizes, then the central directory and end records.
+    Returns "in place" or "shifted".
+    """
+    size = os.path.getsize(src_path)
+    with open(zip_path, "r+b") as f:
+        layout = read_zip_layout(f)
+        entries = read_central_directory(f, layout)
+        entry = find_member(entries, name)
+        local_fields, local_name, local_extra, data_offset = read_local_header(f, entry)
+        cd_offset = layout["cd_offset"]
+        later = [e["local_offset"] for e in entries if e["local_offset"] > entry["local_offset"]]
+        slot_end = min(later + [cd_offset])
+        is_last = slot_end == cd_offset
+
+        # Sizes that do not fit in 32 bits go to the local zip64 block, which is added if missing.
+        local_blocks = [b for b in parse_extra(local_extra) if b[0] != ZIP64_EXTRA_ID]
+        local_zip64 = size >= 0xFFFFFFFF or local_fields[7] == 0xFFFFFFFF or local_fields[8] == 0xFFFFFFFF
+        if local_zip64:
+            local_blocks.insert(0, (ZIP64_EXTRA_ID, struct.pack("<2Q", size, size)))
+        new_local_extra = build_extra(local_blocks)
+        local_offset = entry["local_offset"]
+        data_offset = local_offset + LOCAL_STRUCT.size + len(local_name) + len(new_local_extra)
+        # An old data descriptor lies inside the slot and is dropped with the old data.
+        shift = 0 if is_last else max(0, data_offset + size - slot_end)
+        new_cd_offset = data_offset + size if is_last else cd_offset + shift
+        if not layout["zip64"] and new_cd_offset >= 0xFFFFFFFF:
+            raise ZipLayoutError("the replaced archive would need zip64 end records")
+
+        if shift:
+            shift_members(f, entries, slot_end, cd_offset, shift)
+        crc, written = write_file_at(f, src_path, data_offset, progress)
+        if written != size:
+            raise ZipLayoutError(f"{src_path} changed while it was being copied")
+        if not is_last and not shift:
+            # Clear what is left of the old data so the slot holds no stale bytes.
+            zero_fill(f, data_offset + size, slot_end)
+
+        local_fields[2] &= ~0x8
+        local_fields[3] = STORED
+        local_fields[6] = crc
+        local_fields[7] = local_fields[8] = 0xFFFFFFFF if local_zip64 else size
+        f.seek(local_offset)
+        f.write(pack_local_header(local_fields, local_name, new_local_extra))
+
+        set_entry_values(entry, crc, size, local_offset)
+        cd = b"".join(pack_cd_entry(e) for e in entries)
+        f.seek(new_cd_offset)
+        f.write(cd + pack_end_records(layout, new_cd_offset, len(cd), layout["comment"]))
+        f.truncate()
+    return "shifted" if shift else "in place"
+
+# ---------------------------
+# Size matching
+# ---------------------------
+def plan_padding(entries, need):
+    """
+    Split need padding bytes between PAD_EXTRA_ID blocks in central directory entries
+    and a zero-filled gap before the central directory, for what the blocks cannot take.
+    Returns ({entry index: block data length}, gap length).
+    """
+    blocks = {}
+    remaining = need
+    for index, entry in enumerate(entries):
+        # Each block costs a 4-byte header, so 1-3 bytes can only go to the gap.
+        if remaining < 4:
+            break
+        take = min(remaining, MAX_FIELD - len(entry["extra"]))
+        if 0 < remaining - take < 4:
+            take = remaining - 4
+        if take < 4:
+            continue
+        blocks[index] = take - 4
+        remaining -= take
+    return blocks, remaining
+
+def dead_space(f, entries, cd_offset):
+    """(start, end) of every run of bytes after a member that no member uses, up to the central directory."""
+    spans = []
+    members = sorted(entries, key=lambda e: e["local_offset"])
+    for entry, limit in zip(members, [e["local_offset"] for e in members[1:]] + [cd_offset]):
+        end = member_end(f, entry)
+        if end < limit:
+            spans.append((end, limit))
+    return spans
+
+def reclaim_dead_space(f, entries, spans, cd_offset, amount):
+    """
+    Remove up to amount bytes of dead space (spans from dead_space), taking the spans
+    nearest the central directory first so the fewest bytes move. The members above each
+    reclaimed span are moved down and their central directory entries updated.
+    Returns the number of bytes reclaimed; the central directory moves down by as much.
+    """
+    taken = []
+    remaining = amount
+    for start, end in reversed(spans):
+        if not remaining:
+            break
+        count = min(end - start, remaining)
+        taken.append((end - count, end))
+        remaining -= count
+    taken.sort()
+    shift = 0
+    for index, (start, end) in enumerate(taken):
+        shift += end - start
+        # Members up to the next reclaimed run move down by everything reclaimed so far.
+        limit = taken[index + 1][0] if index + 1 < len(taken) else cd_offset
+        shift_members(f, entries, end, limit, -shift)
+    return shift
+
+def blind_resize(path, target, reason):
+    print(f"⚠️ {reason}")
+    print(f"⚠️ Falling back to a blind resize to {target} bytes; the zip end records will not be valid.")
+    os.truncate(path, target)
+    return "blind"
+
+def match_size(path, target, allow_larger=False):
+    """
+    Make the zip at path exactly target bytes long while keeping it a valid archive.
+    Padding this tool added earlier (PAD_EXTRA_ID blocks, bytes after the end record) is
+    removed first. A larger archive is then shrunk by reclaiming dead space between
+    members and before the central directory (zeroed slot tails, earlier padding gaps);
+    a smaller one is padded through central directory extra fields, then a gap before
+    the central directory. The EOCD comment is never changed.
+    Returns "exact", "padded", "reclaimed", "larger" (allow_larger was given and even
+    all dead space was not enough; the archive is left valid at its smallest size) or
+    "blind" (the archive could not be parsed, so it was truncated or extended without
+    regard to its records). Without allow_larger that case raises ZipLayoutError
+    before anything is written.
+    """
+    with open(path, "r+b") as f:
+        try:
+            layout = read_zip_layout(f)
+            entries = read_central_directory(f, layout)
+        except ZipLayoutError as e:
+            return blind_resize(path, target, f"Cannot parse {path}: {e}")
+        if layout["size"] == target:
+            return "exact"
+        end_start = layout["zip64"]["offset"] if layout["zip64"] else layout["eocd_offset"]
+        if layout["cd_offset"] + layout["cd_size"] != end_start:
+            raise ZipLayoutError("central directory is not directly followed by the end records")
+
+        for entry in entries:
+            entry["extra"] = build_extra([b for b in parse_extra(entry["extra"]) if b[0] != PAD_EXTRA_ID])
+        cd_offset = layout["cd_offset"]
+        end_size = len(pack_end_records(layout, 0, 0, layout["comment"]))
+        need = target - (cd_offset + sum(len(pack_cd_entry(e)) for e in entries) + end_size)
+        result = "padded"
+        if need < 0:
+            spans = dead_space(f, entries, cd_offset)
+            available = sum(end - start for start, end in spans)
+            if available < -need and not allow_larger:
+                raise ZipLayoutError(
+                    f"archive is {-need} bytes larger than the target and only {available} bytes of "
+                    f"unused space can be reclaimed; make the modified files smaller, or allow a larger archive")
+            cd_offset -= reclaim_dead_space(f, entries, spans, cd_offset, -need)
+            # Lower offsets can drop zip64 values, so measure the central directory again.
+            need = target - (cd_offset + sum(len(pack_cd_entry(e)) for e in entries) + end_size)
+            result = "larger" if need < 0 else "reclaimed"
+
+        blocks, gap = plan_padding(entries, max(need, 0))
+        for index, length in blocks.items():
+            entries[index]["extra"] += build_extra([(PAD_EXTRA_ID, b"\x00" * length)])
+        zero_fill(f, cd_offset, cd_offset + gap)
+        cd_offset += gap
+        cd = b"".join(pack_cd_entry(entry) for entry in entries)
+        if not layout["zip64"] and cd_offset >= 0xFFFFFFFF:
+            raise ZipLayoutError("the padded archive would need zip64 end records")
+        f.seek(cd_offset)
+        f.write(cd + pack_end_records(layout, cd_offset, len(cd), layout["comment"]))
+        f.truncate()
+        final_size = f.tell()
+    if final_size != target and result != "larger":
+        raise ZipLayoutError(f"padded size {final_size} does not match the target {target}")
+    return result
+
+def read_target_size(args):
+    if args.size is not None:
+        return args.size
+    with open(args.size_file, "r") as f:
+        return int(f.read().strip())
+
+# ---------------------------
+# Command line
+# ---------------------------
+def cmd_size(args):
+    target = read_target_size(args)
+    current = os.path.getsize(args.obb)
+    print(f"📏 {os.path.basename(args.obb)}: {current} bytes, target {target} bytes ({target - current:+d}).")
+    try:
+        result = match_size(args.obb, target, args.allow_larger)
+    except ZipLayoutError as e:
+        print(f"❌ Cannot match the size: {e.args[0]}")
+        if not args.allow_larger:
+            print("💡 Use --allow-larger to keep the archive valid at its smallest possible size instead.")
+        return 1
+    if result == "exact":
+        print("✅ Size already matches.")
+    elif result == "padded":
+        print("✅ Size matched through zip padding.")
+    elif result == "reclaimed":
+        print("✅ Size matched by reclaiming unused space between members.")
+    elif result == "larger":
+        print(f"⚠️ Kept the archive valid at {os.path.getsize(args.obb)} bytes, larger than the target.")
+    return 0 if result not in ("blind", "larger") else 2
+
+def cmd_extract(args):
+    for name in args.members:
+        try:
+            out_path = extract_member(args.obb, name, args.dest)
+        except (KeyError, ZipLayoutError) as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+        print(f"✅ Extracted {name} ({os.path.getsize(out_path)} bytes) to {out_path}")
+    return 0
+
+def cmd_replace(args):
+    try:
+        mode = replace_member(args.obb, args.member, args.source)
+    except (KeyError, ZipLayoutError) as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    print(f"✅ Replaced {args.member} ({mode}, {os.path.getsize(args.source)} bytes).")
+    if mode == "shifted":
+        print("⚠️ The new data did not fit the old slot; the members after it were moved up.")
+    return 0
+
+def cmd_cache(args):
+    try:
+        path, reused = cached_member(args.obb, args.cache_dir, args.member, args.verify)
+    except (KeyError, ZipLayoutError) as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    print(f"✅ {'Reused cached' if reused else 'Cached'} pristine {args.member}.")
+    if args.out:
+        how = clone_file(path, args.out, writable=not args.read_only)
+        print(f"✅ {args.out} ready ({how}).")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="OBB (zip) maintenance tool used by rep.sh.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    size = sub.add_parser("size", help="match the OBB size exactly by padding or compacting the zip")
+    size.add_argument("obb")
+    group = size.add_mutually_exclusive_group(required=True)
+    group.add_argument("--size", type=int, help="target size in bytes")
+    group.add_argument("--size-file", help="file holding the target size (sizeobb.ini)")
+    size.add_argument("--allow-larger", action="store_true",
+                      help="if the target cannot be reached, leave a valid archive as small as possible")
+    size.set_defaults(func=cmd_size)
+
+    extract = sub.add_parser("extract", help="extract selected members without unpacking the whole OBB")
+    extract.add_argument("obb")
+    extract.add_argument("members", nargs="*", default=[PAK_MEMBER], help=f"member paths (default: {PAK_MEMBER})")
+    extract.add_argument("-d", "--dest", default=".", help="output directory (member paths are kept)")
+    extract.set_defaults(func=cmd_extract)
+
+    cache = sub.add_parser("cache", help="get a pristine member from a cache keyed by the original OBB's hash")
+    cache.add_argument("obb", help="original (unmodified) OBB")
+    cache.add_argument("cache_dir")
+    cache.add_argument("--member", default=PAK_MEMBER)
+    cache.add_argument("-o", "--out", help="where to place a copy of the cached member")
+    cache.add_argument("--read-only", action="store_true", help="--out is never modified, so it may be a hardlink")
+    cache.add_argument("--verify", action="store_true", help="re-check the cached member's CRC32 before reuse")
+    cache.set_defaults(func=cmd_cache)
+
+    replace = sub.add_parser("replace", help="replace one member (stored) without rebuilding the OBB")
+    replace.add_argument("obb")
+    replace.add_argument("member", help=f"member path inside the OBB, e.g. {PAK_MEMBER}")
+    replace.add_argument("source", help="file holding the new member contents")
+    replace.set_defaults(func=cmd_replace)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
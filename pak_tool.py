@@ -0,0 +1,705 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from obb_tool import clone_file
+
+# ---------------------------
+# Pak record layouts
+# ---------------------------
+PAK_MAGIC = 0x5A6F12E1
+# Legacy index layouts (mount point + flat entry list) are used up to this version.
+MAX_VERSION = 9
+# Version 1 entries carry a timestamp; 3 adds compression blocks; 4 an encrypted-index
+# flag; 5 makes block offsets relative to the entry; 7 an encryption key GUID;
+# 8 compression method names in the footer; 9 a frozen-index flag.
+VERSION_TIMESTAMP = 1
+VERSION_COMPRESSION_BLOCKS = 3
+VERSION_INDEX_ENCRYPTION = 4
+VERSION_RELATIVE_CHUNKS = 5
+VERSION_ENCRYPTION_KEY_GUID = 7
+VERSION_COMPRESSION_NAMES = 8
+VERSION_FROZEN_INDEX = 9
+
+COMPRESSION_NAME_SIZE = 32
+COMPRESS_NONE = 0
+# Pre-v8 compression flag for zlib (bias flags 0x10/0x20 may be or-ed in).
+COMPRESS_ZLIB = 0x01
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_MOUNT_POINT = "../../../"
+# Read size when copying entry data.
+COPY_CHUNK = 1024 * 1024
+# Threads used for zlib blocks (zlib releases the GIL while it works).
+BLOCK_WORKERS = os.cpu_count() or 1
+# Blocks queued per worker; bounds the compressed/uncompressed data held in flight.
+BLOCKS_IN_FLIGHT = 4
+
+
+class PakError(Exception):
+    """Raised when a pak file cannot be parsed or an entry cannot be read."""
+
+
+# ---------------------------
+# Helpers: serialization
+# ---------------------------
+def footer_size(version, name_count=5):
+    size = 44
+    if version >= VERSION_INDEX_ENCRYPTION:
+        size += 1
+    if version >= VERSION_ENCRYPTION_KEY_GUID:
+        size += 16
+    if version >= VERSION_COMPRESSION_NAMES:
+        size += COMPRESSION_NAME_SIZE * name_count
+    if version >= VERSION_FROZEN_INDEX:
+        size += 1
+    return size
+
+def read_fstring(data, pos):
+    """Read an Unreal FString at pos; returns (text, new position)."""
+    (length,) = struct.unpack_from("<i", data, pos)
+    pos += 4
+    if length == 0:
+        return "", pos
+    if length < 0:
+        raw = data[pos:pos - 2 * length]
+        return raw.decode("utf-16-le").rstrip("\x00"), pos - 2 * length
+    raw = data[pos:pos + length]
+    return raw.decode("utf-8", errors="replace").rstrip("\x00"), pos + length
+
+def pack_fstring(text):
+    if not text:
+        return struct.pack("<i", 0)
+    try:
+        raw = text.encode("ascii") + b"\x00"
+        return struct.pack("<i", len(raw)) + raw
+    except UnicodeEncodeError:
+        raw = text.encode("utf-16-le") + b"\x00\x00"
+        return struct.pack("<i", -(len(raw) // 2)) + raw
+
+def read_entry_record(data, pos, version):
+    """Read a serialized FPakEntry at pos; returns (entry dict, new position)."""
+    offset, size, uncompressed_size, compression = struct.unpack_from("<3QI", data, pos)
+    pos += 28
+    timestamp = 0
+    if version <= VERSION_TIMESTAMP:
+        (timestamp,) = struct.unpack_from("<Q", data, pos)
+        pos += 8
+    sha1 = data[pos:pos + 20]
+    pos += 20
+    blocks = []
+    encrypted = 0
+    block_size = 0
+    if version >= VERSION_COMPRESSION_BLOCKS:
+        if compression != COMPRESS_NONE:
+            (count,) = struct.unpack_from("<I", data, pos)
+            pos += 4
+            for _ in range(count):
+                blocks.append(struct.unpack_from("<2Q", data, pos))
+                pos += 16
+        encrypted, block_size = struct.unpack_from("<BI", data, pos)
+        pos += 5
+    entry = {
+        "offset": offset,
+        "size": size,
+        "uncompressed_size": uncompressed_size,
+        "compression": compression,
+        "timestamp": timestamp,
+        "hash": sha1,
+        "blocks": blocks,
+        "encrypted": encrypted,
+        "block_size": block_size,
+    }
+    return entry, pos
+
+def pack_entry_record(entry, version, offset=None):
+    """Serialize an FPakEntry (offset overrides entry["offset"], e.g. 0 for in-data headers)."""
+    out = struct.pack("<3QI", entry["offset"] if offset is None else offset,
+                      entry["size"], entry["uncompressed_size"], entry["compression"])
+    if version <= VERSION_TIMESTAMP:
+        out += struct.pack("<Q", entry["timestamp"])
+    out += entry["hash"]
+    if version >= VERSION_COMPRESSION_BLOCKS:
+        if entry["compression"] != COMPRESS_NONE:
+            out += struct.pack("<I", len(entry["blocks"]))
+            out += b"".join(struct.pack("<2Q", start, end) for start, end in entry["blocks"])
+        out += struct.pack("<BI", entry["encrypted"], entry["block_size"])
+    return out
+
+def entry_header_size(entry, version):
+    """Size of the copy of the entry record that precedes its data."""
+    return len(pack_entry_record(entry, version))
+
+def map_ordered(func, items, workers=BLOCK_WORKERS):
+    """
+    Yield func(item) for every item, in order, running up to workers calls at once in a
+    thread pool. At most workers * BLOCKS_IN_FLIGHT items are pulled from items ahead of
+    the consumer, so memory stays bounded however many blocks an entry has.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    window = workers * BLOCKS_IN_FLIGHT
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def compression_name(pak, entry):
+    """Return "none", "zlib" or the footer's method name for an entry."""
+    method = entry["compression"]
+    if method == COMPRESS_NONE:
+        return "none"
+    if pak["version"] >= VERSION_COMPRESSION_NAMES:
+        names = pak["compression_methods"]
+        return names[method - 1].lower() if method <= len(names) else f"method {method}"
+    return "zlib" if method & COMPRESS_ZLIB else f"flags {method:#x}"
+
+# ---------------------------
+# Pak reading
+# ---------------------------
+def read_footer(f, base=0, length=None):
+    """
+    Find and parse the pak footer; returns a dict of its fields.
+    base and length locate a pak stored inside a larger file (offsets stay pak-relative).
+    """
+    if length is None:
+        f.seek(0, os.SEEK_END)
+        length = f.tell() - base
+    file_size = length
+    tail_size = min(file_size, footer_size(MAX_VERSION) + 64)
+    f.seek(base + file_size - tail_size)
+    tail = f.read(tail_size)
+    for version in range(MAX_VERSION, 0, -1):
+        for name_count in ((5, 4) if version == VERSION_COMPRESSION_NAMES else (5,)):
+            size = footer_size(version, name_count)
+            if size > len(tail):
+                continue
+            pos = len(tail) - size
+            footer = {"version": version, "offset": file_size - size, "size": size,
+                      "encryption_key": b"", "encrypted_index": 0, "frozen_index": 0,
+                      "compression_methods": [], "compression_name_count": name_count}
+            if version >= VERSION_ENCRYPTION_KEY_GUID:
+                footer["encryption_key"] = tail[pos:pos + 16]
+                pos += 16
+            if version >= VERSION_INDEX_ENCRYPTION:
+                footer["encrypted_index"] = tail[pos]
+                pos += 1
+            magic, found_version, index_offset, index_size = struct.unpack_from("<2I2Q", tail, pos)
+            if magic != PAK_MAGIC or found_version != version:
+                continue
+            pos += 24
+            footer["index_offset"] = index_offset
+            footer["index_size"] = index_size
+            footer["index_hash"] = tail[pos:pos + 20]
+            pos += 20
+            # bIndexIsFrozen sits between the index hash and the compression names.
+            if version >= VERSION_FROZEN_INDEX:
+                footer["frozen_index"] = tail[pos]
+                pos += 1
+            if version >= VERSION_COMPRESSION_NAMES:
+                for _ in range(name_count):
+                    name = tail[pos:pos + COMPRESSION_NAME_SIZE].split(b"\x00", 1)[0].decode("ascii", errors="replace")
+                    if name:
+                        footer["compression_methods"].append(name)
+                    pos += COMPRESSION_NAME_SIZE
+            return footer
+    raise PakError("pak footer not found (unsupported version or not a pak file)")
+
+def read_pak(path, base=0, length=None):
+    """
+    Parse a pak's footer and index.
+    Returns the footer fields plus "path", "mount_point" and "entries"
+    (a list of entry dicts with "name" and the FPakEntry fields).
+    base and length read a pak stored inside another file, e.g. a stored zip member.
+    """
+    with open(path, "rb") as f:
+        pak = read_footer(f, base, length)
+        if pak["encrypted_index"]:
+            raise PakError("the pak index is encrypted")
+        if pak["frozen_index"]:
+            raise PakError("frozen pak indexes are not supported")
+        if pak["index_offset"] + pak["index_size"] > pak["offset"]:
+            raise PakError("pak index extends past the footer")
+        f.seek(base + pak["index_offset"])
+        index = f.read(pak["index_size"])
+    if len(index) != pak["index_size"]:
+        raise PakError("pak index extends past the end of the file")
+    pak["path"] = path
+    pak["mount_point"], pos = read_fstring(index, 0)
+    (count,) = struct.unpack_from("<i", index, pos)
+    pos += 4
+    entries = []
+    for _ in range(count):
+        name, pos = read_fstring(index, pos)
+        entry, pos = read_entry_record(index, pos, pak["version"])
+        entry["name"] = name
+        entries.append(entry)
+    pak["entries"] = entries
+    return pak
+
+def find_entry(pak, name):
+    """Return the entry whose path, or file name, is name (e.g. a 000xxxxx DAT name)."""
+    name = name.replace("\\", "/")
+    base_matches = []
+    for entry in pak["entries"]:
+        if entry["name"] == name:
+            return entry
+        if entry["name"].rsplit("/", 1)[-1] == name:
+            base_matches.append(entry)
+    if len(base_matches) == 1:
+        return base_matches[0]
+    if base_matches:
+        raise KeyError(f"{name} matches {len(base_matches)} entries; use the full path")
+    raise KeyError(f"{name} not found in pak")
+
+def block_ranges(pak, entry):
+    """Absolute (start, end) file ranges of an entry's compressed blocks."""
+    base = entry["offset"] if pak["version"] >= VERSION_RELATIVE_CHUNKS else 0
+    return [(base + start, base + end) for start, end in entry["blocks"]]
+
+def decompress_block(pak, entry, data):
+    method = compression_name(pak, entry)
+    if method != "zlib":
+        raise PakError(f"{entry['name']}: unsupported compression ({method})")
+    return zlib.decompress(data)
+
+def iter_entry_data(f, pak, entry, workers=BLOCK_WORKERS):
+    """
+    Yield an entry's uncompressed contents in chunks, reading only that entry.
+    Compressed blocks are inflated in parallel and yielded in order.
+    """
+    if entry["encrypted"]:
+        raise PakError(f"{entry['name']} is encrypted")
+    if entry["compression"] == COMPRESS_NONE:
+        f.seek(entry["offset"] + entry_header_size(entry, pak["version"]))
+        remaining = entry["size"]
+        while remaining:
+            chunk = f.read(min(COPY_CHUNK, remaining))
+            if not chunk:
+                raise PakError(f"{entry['name']}: pak ends inside entry data")
+            remaining -= len(chunk)
+            yield chunk
+        return
+    def read_blocks():
+        for start, end in block_ranges(pak, entry):
+            f.seek(start)
+            yield f.read(end - start)
+    yield from map_ordered(lambda data: decompress_block(pak, entry, data), read_blocks(), workers)
+
+def read_entry(pak, entry):
+    """Return an entry's uncompressed contents."""
+    with open(pak["path"], "rb") as f:
+        return b"".join(iter_entry_data(f, pak, entry))
+
+def extract_entry(pak, entry, dest_dir, keep_paths=False):
+    """Write one entry to dest_dir (by file name, or by full path with keep_paths); returns the path."""
+    parts = entry["name"].split("/") if keep_paths else [entry["name"].rsplit("/", 1)[-1]]
+    out_path = os.path.join(dest_dir, *parts)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    written = 0
+    with open(pak["path"], "rb") as f, open(out_path, "wb") as out:
+        for chunk in iter_entry_data(f, pak, entry):
+            out.write(chunk)
+            written += len(chunk)
+    if written != entry["uncompressed_size"]:
+        raise PakError(f"{entry['name']}: extracted {written} bytes, index says {entry['uncompressed_size']}")
+    return out_path
+
+# ---------------------------
+# Pak writing
+# ---------------------------
+def compression_method_id(version, method):
+    if method == "none":
+        return COMPRESS_NONE
+    if method != "zlib":
+        raise PakError(f"unsupported compression {method}")
+    return 1 if version >= VERSION_COMPRESSION_NAMES else COMPRESS_ZLIB
+
+def encode_entry(version, data, compression=COMPRESS_NONE, block_size=DEFAULT_BLOCK_SIZE, workers=BLOCK_WORKERS):
+    """
+    Build the entry record and payload for data placed at offset 0, zlib-compressing
+    it in block_size blocks (in parallel) unless compression is COMPRESS_NONE.
+    Returns (entry, payload); block offsets are fixed up by place_entry.
+    """
+    entry = {
+        "offset": 0,
+        "size": len(data),
+        "uncompressed_size": len(data),
+        "compression": compression,
+        "timestamp": 0,
+        "hash": b"",
+        "blocks": [],
+        "encrypted": 0,
+        "block_size": 0,
+    }
+    if entry["compression"] == COMPRESS_NONE:
+        entry["hash"] = hashlib.sha1(data).digest()
+        return entry, data
+    if version < VERSION_COMPRESSION_BLOCKS:
+        raise PakError(f"pak version {version} has no compression blocks")
+    view = memoryview(data)
+    blocks = (view[i:i + block_size] for i in range(0, len(data), block_size))
+    chunks = list(map_ordered(zlib.compress, blocks, workers)) or [zlib.compress(b"")]
+    payload = b"".join(chunks)
+    entry["size"] = len(payload)
+    entry["hash"] = hashlib.sha1(payload).digest()
+    entry["block_size"] = min(block_size, len(data))
+    entry["chunk_sizes"] = [len(chunk) for chunk in chunks]
+    return entry, payload
+
+def place_entry(entry, version, offset):
+    """Set an encoded entry's offset and block ranges for data written at offset."""
+    entry["offset"] = offset
+    sizes = entry.pop("chunk_sizes", None)
+    if sizes is None:
+        sizes = [end - start for start, end in entry["blocks"]]
+    # Block ranges do not change the header size (same block count), so measure it first.
+    entry["blocks"] = [(0, 0)] * len(sizes) if entry["compression"] != COMPRESS_NONE else []
+    start = entry_header_size(entry, version)
+    if version < VERSION_RELATIVE_CHUNKS:
+        start += offset
+    blocks = []
+    for size in sizes:
+        blocks.append((start, start + size))
+        start += size
+    entry["blocks"] = blocks
+    return entry
+
+def pack_index(mount_point, entries, version):
+    out = pack_fstring(mount_point) + struct.pack("<i", len(entries))
+    for entry in entries:
+        out += pack_fstring(entry["name"]) + pack_entry_record(entry, version)
+    return out
+
+def pack_footer(pak, index_offset, index):
+    version = pak["version"]
+    out = b""
+    if version >= VERSION_ENCRYPTION_KEY_GUID:
+        out += pak.get("encryption_key") or b"\x00" * 16
+    if version >= VERSION_INDEX_ENCRYPTION:
+        out += b"\x00"
+    out += struct.pack("<2I2Q", PAK_MAGIC, version, index_offset, len(index))
+    out += hashlib.sha1(index).digest()
+    if version >= VERSION_FROZEN_INDEX:
+        out += b"\x00"
+    if version >= VERSION_COMPRESSION_NAMES:
+        name_count = pak.get("compression_name_count", 5)
+        names = list(pak.get("compression_methods") or ["Zlib"])
+        names += [""] * (name_count - len(names))
+        out += b"".join(n.encode("ascii").ljust(COMPRESSION_NAME_SIZE, b"\x00") for n in names[:name_count])
+    return out
+
+def write_pak(path, files, version=3, method="none", block_size=DEFAULT_BLOCK_SIZE, mount_point=DEFAULT_MOUNT_POINT):
+    """
+    Write a pak holding files ({entry name: bytes}) with a legacy index.
+    Used to build synthetic paks for checking the reader and writer locally.
+    """
+    pak = {"version": version, "compression_methods": ["Zlib"] if method == "zlib" else []}
+    entries = []
+    with open(path, "wb") as f:
+        for name, data in files.items():
+            entry, payload = encode_entry(version, data, compression_method_id(version, method), block_size)
+            place_entry(entry, version, f.tell())
+            entry["name"] = name
+            f.write(pack_entry_record(entry, version, offset=0))
+            f.write(payload)
+            entries.append(entry)
+        index = pack_index(mount_point, entries, version)
+        index_offset = f.tell()
+        f.write(index)
+        f.write(pack_footer(pak, index_offset, index))
+    return path
+
+def entry_matches(f, pak, entry, path):
+    """True if the file at path has the same contents as the entry (checked by SHA1)."""
+    if os.path.getsize(path) != entry["uncompressed_size"]:
+        return False
+    file_hash = hashlib.sha1()
+    with open(path, "rb") as src:
+        for chunk in iter(lambda: src.read(COPY_CHUNK), b""):
+            file_hash.update(chunk)
+    if entry["compression"] == COMPRESS_NONE:
+        return file_hash.digest() == entry["hash"]
+    entry_hash = hashlib.sha1()
+    for chunk in iter_entry_data(f, pak, entry):
+        entry_hash.update(chunk)
+    return file_hash.digest() == entry_hash.digest()
+
+def collect_reimport_files(pak, source_dir):
+    """
+    Map pak entries to replacement files found (recursively) in source_dir by path or file name.
+    Returns ({entry index: path}, list of messages about skipped files). A file with the
+    extension of some pak entry (e.g. .dat) that matches no entry is reported, so a
+    mistyped name is not silently ignored; other files (changelogs, logs) are skipped quietly.
+    Raises PakError, before anything is changed, when several files map to one entry
+    (e.g. the same DAT edited in two REPACK_OBB subfolders), since either choice would
+    silently drop the other folder's edits.
+    """
+    positions = {id(entry): i for i, entry in enumerate(pak["entries"])}
+    entry_exts = {os.path.splitext(entry["name"])[1].lower() for entry in pak["entries"]} - {""}
+    chosen = {}
+    clashes = {}
+    messages = []
+    pak_path = os.path.abspath(pak["path"])
+    for root, _, names in os.walk(source_dir):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if os.path.abspath(path) == pak_path:
+                continue
+            rel = os.path.relpath(path, source_dir).replace(os.sep, "/")
+            try:
+                entry = find_entry(pak, rel)
+            except KeyError:
+                try:
+                    entry = find_entry(pak, name)
+                except KeyError as e:
+                    if "matches" in e.args[0]:
+                        messages.append(f"⚠️ Skipped {rel}: {e.args[0]}")
+                    elif os.path.splitext(name)[1].lower() in entry_exts:
+                        messages.append(f"⚠️ Skipped {rel}: no pak entry has this path or file name")
+                    continue
+            index = positions[id(entry)]
+            if index in chosen:
+                clashes.setdefault(index, [os.path.relpath(chosen[index], source_dir).replace(os.sep, "/")]).append(rel)
+                continue
+            chosen[index] = path
+    if clashes:
+        lines = [f"{pak['entries'][index]['name']}: {', '.join(rels)}" for index, rels in sorted(clashes.items())]
+        raise PakError("several files replace the same entry; keep one copy of each:\n  " + "\n  ".join(lines))
+    return chosen, messages
+
+def free_spans(pak):
+    """Sorted (start, end) ranges between entry slots, up to the index, that no entry uses."""
+    spans = []
+    position = 0
+    for entry in sorted(pak["entries"], key=lambda e: e["offset"]):
+        if entry["offset"] > position:
+            spans.append((position, entry["offset"]))
+        position = max(position, entry["offset"] + entry_header_size(entry, pak["version"]) + entry["size"])
+    if position < pak["index_offset"]:
+        spans.append((position, pak["index_offset"]))
+    return spans
+
+def release_span(spans, start, end):
+    """Add [start, end) to the sorted free spans, merging it with its neighbours."""
+    spans.append((start, end))
+    spans.sort()
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], span[1]))
+        else:
+            merged.append(span)
+    spans[:] = merged
+
+def allocate_span(spans, size, data_end):
+    """
+    Take size bytes for an entry: the smallest free span that fits, else the end of the
+    data (extending a free span that reaches it). Returns (offset, new data end).
+    """
+    fits = [span for span in spans if span[1] - span[0] >= size]
+    if fits:
+        start, end = min(fits, key=lambda span: span[1] - span[0])
+    elif spans and spans[-1][1] == data_end:
+        start, end = spans[-1]
+    else:
+        return data_end, data_end + size
+    spans.remove((start, end))
+    if start + size < end:
+        release_span(spans, start + size, end)
+    return start, max(data_end, start + size)
+
+def reimport_files(pak_path, source_dir, progress=None, atomic=True):
+    """
+    Replace pak entries with the files in source_dir (matched by path or file name).
+    Unchanged files are skipped. Each changed entry is re-encoded with its original
+    compression and block size and written over its old slot when it fits. The others
+    are placed afterwards, largest first: each goes to the smallest free range that fits
+    (its own old slot, slot tails and slots freed in this run, gaps already in the pak),
+    and only when none does after the last entry.
+    The index and footer (with the new index hash) are rewritten after the last entry,
+    so the pak only grows when no free range is large enough.
+    With atomic, the edits are made on a clone that replaces pak_path only once it is
+    complete, so an error or interrupt leaves the original pak intact; pass atomic=False
+    for a throwaway working copy that is edited directly.
+    Returns a dict of counts and messages.
+    progress, if given, is called as progress(files done, files to process).
+    """
+    pak = read_pak(pak_path)
+    version = pak["version"]
+    chosen, messages = collect_reimport_files(pak, source_dir)
+    result = {"in_place": 0, "moved": 0, "appended": 0, "unchanged": 0, "messages": messages}
+    changed = []
+    with open(pak_path, "rb") as f:
+        for done, index in enumerate(sorted(chosen)):
+            if progress:
+                progress(done, len(chosen))
+            entry = pak["entries"][index]
+            if entry["encrypted"]:
+                messages.append(f"❌ {entry['name']} is encrypted; not replaced")
+            elif entry["compression"] != COMPRESS_NONE and compression_name(pak, entry) != "zlib":
+                messages.append(f"❌ {entry['name']} uses {compression_name(pak, entry)} compression; not replaced")
+            elif entry_matches(f, pak, entry, chosen[index]):
+                result["unchanged"] += 1
+            else:
+                changed.append(index)
+    total = len(chosen) + len(changed)
+    if progress:
+        progress(len(chosen), total)
+    if not changed:
+        return result
+
+    work_path = pak_path + ".tmp" if atomic else pak_path
+    if atomic:
+        clone_file(pak_path, work_path, writable=True)
+    try:
+        spans = free_spans(pak)
+        data_end = pak["index_offset"]
+        done = len(chosen)
+        moving = []
+        with open(work_path, "r+b") as f:
+            for index in changed:
+                entry = pak["entries"][index]
+                with open(chosen[index], "rb") as src:
+                    data = src.read()
+                new_entry, payload = encode_entry(version, data, entry["compression"], entry["block_size"] or DEFAULT_BLOCK_SIZE)
+                new_entry["timestamp"] = entry["timestamp"]
+                new_entry["name"] = entry["name"]
+                # The header size does not depend on the offset, so measure the record at the old one.
+                place_entry(new_entry, version, entry["offset"])
+                size = entry_header_size(new_entry, version) + len(payload)
+                slot_end = entry["offset"] + entry_header_size(entry, version) + entry["size"]
+                if entry["offset"] + size <= slot_end:
+                    result["in_place"] += 1
+                    release_span(spans, entry["offset"] + size, slot_end)
+                    f.seek(entry["offset"])
+                    f.write(pack_entry_record(new_entry, version, offset=0) + payload)
+                    pak["entries"][index] = new_entry
+                    done += 1
+                    if progress:
+                        progress(done, total)
+                else:
+                    # Placed once every in-place entry has given back its slot tail.
+                    release_span(spans, entry["offset"], slot_end)
+                    moving.append((size, index, new_entry, payload))
+            for size, index, new_entry, payload in sorted(moving, key=lambda item: -item[0]):
+                offset, new_end = allocate_span(spans, size, data_end)
+                result["appended" if new_end > data_end else "moved"] += 1
+                data_end = new_end
+                place_entry(new_entry, version, offset)
+                f.seek(offset)
+                f.write(pack_entry_record(new_entry, version, offset=0) + payload)
+                pak["entries"][index] = new_entry
+                done += 1
+                if progress:
+                    progress(done, total)
+            # Free space at the end of the data is dropped; the rest is cleared of stale bytes.
+            if spans and spans[-1][1] >= data_end:
+                data_end = spans.pop()[0]
+            for start, end in spans:
+                f.seek(start)
+                f.write(b"\x00" * (end - start))
+            index_data = pack_index(pak["mount_point"], pak["entries"], version)
+            f.seek(data_end)
+            f.write(index_data)
+            f.write(pack_footer(pak, data_end, index_data))
+            f.truncate()
+        if atomic:
+            os.replace(work_path, pak_path)
+    except BaseException:
+        if atomic and os.path.exists(work_path):
+            os.remove(work_path)
+        raise
+    return result
+
+# ---------------------------
+# Command line
+# ---------------------------
+def cmd_list(args):
+    pak = read_pak(args.pak)
+    print(f"📦 {args.pak}: version {pak['version']}, mount point {pak['mount_point']}, {len(pak['entries'])} entries")
+    for entry in pak["entries"]:
+        print(f"{entry['offset']:>12}  {entry['size']:>10}  {entry['uncompressed_size']:>10}  "
+              f"{compression_name(pak, entry):<5}  {entry['name']}")
+    return 0
+
+def cmd_extract(args):
+    pak = read_pak(args.pak)
+    names = args.names or [entry["name"] for entry in pak["entries"]]
+    for name in names:
+        try:
+            out_path = extract_entry(pak, find_entry(pak, name), args.dest, args.keep_paths)
+        except (KeyError, PakError) as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+        print(f"✅ {name} -> {out_path}")
+    return 0
+
+def cmd_pack(args):
+    files = {}
+    for root, _, names in os.walk(args.source):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, args.source).replace(os.sep, "/")] = f.read()
+    write_pak(args.pak, files, args.version, args.compression, args.block_size)
+    print(f"✅ Wrote {len(files)} entries to {args.pak}")
+    return 0
+
+def cmd_reimport(args):
+    result = reimport_files(args.pak, args.source)
+    for message in result["messages"]:
+        print(message)
+    print(f"✅ Reimported into {args.pak}: {result['in_place']} in place, {result['moved']} moved to free space, "
+          f"{result['appended']} appended, {result['unchanged']} unchanged.")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Native reader/writer for Unreal pak files (mini_obb.pak).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    listing = sub.add_parser("list", help="list entries with offsets, sizes and compression")
+    listing.add_argument("pak")
+    listing.set_defaults(func=cmd_list)
+
+    extract = sub.add_parser("extract", help="extract entries by path or file name (e.g. a 000xxxxx DAT)")
+    extract.add_argument("pak")
+    extract.add_argument("names", nargs="*", help="entries to extract (default: all)")
+    extract.add_argument("-d", "--dest", default=".")
+    extract.add_argument("--keep-paths", action="store_true", help="recreate the entry paths under --dest")
+    extract.set_defaults(func=cmd_extract)
+
+    reimport = sub.add_parser("reimport", help="replace entries with the changed files in a folder")
+    reimport.add_argument("pak")
+    reimport.add_argument("source", help="folder searched recursively for files named like pak entries")
+    reimport.set_defaults(func=cmd_reimport)
+
+    pack = sub.add_parser("pack", help="build a synthetic pak from a directory (for local testing)")
+    pack.add_argument("pak")
+    pack.add_argument("source")
+    pack.add_argument("--version", type=int, default=3, choices=range(1, MAX_VERSION + 1))
+    pack.add_argument("--compression", choices=("none", "zlib"), default="none")
+    pack.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    pack.set_defaults(func=cmd_pack)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except PakError as e:
+        print(f"❌ {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
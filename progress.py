@@ -0,0 +1,101 @@
+import sys
+import time
+
+# rich is optional: without it progress is printed as plain text lines.
+try:
+    from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+except ImportError:
+    Progress = None
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Minimum seconds between plain-text progress lines for one step.
+PLAIN_INTERVAL = 2.0
+
+def format_amount(value, unit):
+    if unit == "bytes":
+        return f"{value / (1024 * 1024):.1f} MiB"
+    return f"{value} {unit}".rstrip()
+
+# ---------------------------
+# Reporter
+# ---------------------------
+class ProgressReporter:
+    """
+    One progress display for a whole run: each step() gets its own bar (rich) or
+    throttled status lines (plain text), updated from real work via step.update().
+    Use as a context manager so the rich display is started and stopped once.
+    """
+
+    def __init__(self, use_rich=None):
+        self.use_rich = Progress is not None if use_rich is None else use_rich and Progress is not None
+        self._progress = None
+
+    def __enter__(self):
+        if self.use_rich:
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("{task.percentage:>3.0f}%"),
+                TimeElapsedColumn(),
+            )
+            self._progress.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._progress:
+            self._progress.stop()
+            self._progress = None
+        return False
+
+    def log(self, message):
+        if self._progress:
+            self._progress.console.print(message, markup=False, highlight=False)
+        else:
+            print(message, flush=True)
+
+    def step(self, description, total=None, unit=""):
+        return ProgressStep(self, description, total, unit)
+
+
+class ProgressStep:
+    """A single step of a ProgressReporter; pass step.update as a progress callback."""
+
+    def __init__(self, reporter, description, total=None, unit=""):
+        self.reporter = reporter
+        self.description = description
+        self.total = total
+        self.unit = unit
+        self.completed = 0
+        self.started = time.monotonic()
+        self._last_line = 0.0
+        self._task = None
+        if reporter._progress:
+            self._task = reporter._progress.add_task(description, total=total)
+        else:
+            reporter.log(f"⏳ {description}...")
+
+    def update(self, completed, total=None):
+        self.completed = completed
+        if total is not None:
+            self.total = total
+        if self._task is not None:
+            self.reporter._progress.update(self._task, completed=completed, total=self.total)
+            return
+        now = time.monotonic()
+        if now - self._last_line >= PLAIN_INTERVAL and self.total:
+            self._last_line = now
+            percent = 100 * completed / self.total if self.total else 100
+            sys.stdout.write(f"   {self.description}: {percent:3.0f}% "
+                             f"({format_amount(completed, self.unit)} / {format_amount(self.total, self.unit)})\n")
+            sys.stdout.flush()
+
+    def done(self, note=""):
+        elapsed = time.monotonic() - self.started
+        if self._task is not None:
+            total = self.total if self.total else 1
+            self.reporter._progress.update(self._task, completed=total, total=total)
+        suffix = f" ({note})" if note else ""
+        self.reporter.log(f"✅ {self.description}{suffix} in {elapsed:.1f}s")
@@ -0,0 +1,130 @@
+import argparse
+import glob
+import os
+import shutil
+import sys
+
+from obb_tool import PAK_MEMBER, ZipLayoutError, cached_member, clone_file, match_size, replace_member
+from pak_tool import PakError, reimport_files
+from progress import ProgressReporter
+from verify_obb import MAX_REPORTED, VerifyError, verify_obb
+
+# ---------------------------
+# Paths (same layout rep.sh used)
+# ---------------------------
+ORIGINAL_DIR = "/storage/emulated/0/FILES_OBB/ORIGINAL"
+OBB_DIR = os.path.join(ORIGINAL_DIR, "OBB")
+OUTPUT_DIR = os.path.join(OBB_DIR, "output")
+REPACK_DIR = "/storage/emulated/0/FILES_OBB/REPACK_OBB"
+CACHE_DIR = os.path.join(ORIGINAL_DIR, "cache")
+SIZE_FILE = os.path.join(OBB_DIR, "sizeobb.ini")
+REPACK_PAK = os.path.join(REPACK_DIR, "mini_obb.pak")
+
+class RepackError(Exception):
+    """Raised when the repack inputs are ambiguous."""
+
+# ---------------------------
+# Steps
+# ---------------------------
+def cleanup_outputs(reporter):
+    """Delete the outputs of a previous run."""
+    for path in glob.glob(os.path.join(OUTPUT_DIR, "*.obb")):
+        os.remove(path)
+        reporter.log(f"🧹 Previous OBB deleted: {path}")
+    for path in [REPACK_PAK, SIZE_FILE] + glob.glob(os.path.join(OBB_DIR, "*.zip")):
+        if os.path.exists(path):
+            os.remove(path)
+            reporter.log(f"🧹 Deleted {path}")
+    extracted = os.path.join(OUTPUT_DIR, "ShadowTrackerExtra")
+    if os.path.isdir(extracted):
+        shutil.rmtree(extracted)
+        reporter.log(f"🧹 Deleted folder {extracted}")
+
+def find_original_obb():
+    """Return the one original .obb; several would leave the repack guessing which to use."""
+    originals = sorted(glob.glob(os.path.join(ORIGINAL_DIR, "*.obb")))
+    if not originals:
+        raise FileNotFoundError(f"No .obb file found in {ORIGINAL_DIR}")
+    if len(originals) > 1:
+        names = ", ".join(os.path.basename(path) for path in originals)
+        raise RepackError(f"{len(originals)} .obb files found in {ORIGINAL_DIR} ({names}); keep only the original")
+    return originals[0]
+
+def repak_obb(reporter, allow_larger=False):
+    """
+    Rebuild the OBB from the original and the files in REPACK_OBB:
+    copy the original, take a pristine mini_obb.pak from the cache, reimport the
+    modified files into it, replace it inside the OBB, match the original size and
+    verify the result. With allow_larger, an OBB that cannot be brought down to the
+    original size is kept valid but larger instead of failing the run.
+    Returns the path of the rebuilt OBB.
+    """
+    reporter.log("=== STARTING OBB REPACK PROCESS ===")
+    for folder in (ORIGINAL_DIR, OBB_DIR, OUTPUT_DIR, REPACK_DIR):
+        os.makedirs(folder, exist_ok=True)
+    cleanup_outputs(reporter)
+
+    original = find_original_obb()
+    output_obb = os.path.join(OUTPUT_DIR, os.path.basename(original))
+    original_size = os.path.getsize(original)
+    with open(SIZE_FILE, "w") as f:
+        f.write(f"{original_size}\n")
+
+    step = reporter.step("Copying original OBB", original_size, "bytes")
+    how = clone_file(original, output_obb, writable=True, progress=step.update)
+    step.done(how)
+
+    step = reporter.step("Preparing pristine mini_obb.pak", unit="bytes")
+    cached_pak, reused = cached_member(original, CACHE_DIR, PAK_MEMBER, progress=step.update)
+    how = clone_file(cached_pak, REPACK_PAK, writable=True, progress=step.update)
+    step.done(f"{'cached' if reused else 'extracted'}, {how}")
+
+    step = reporter.step("Reimporting modified files into mini_obb.pak", unit="files")
+    # REPACK_PAK is a fresh clone of the cached pak, so it is edited directly rather than through another copy.
+    result = reimport_files(REPACK_PAK, REPACK_DIR, progress=step.update, atomic=False)
+    for message in result["messages"]:
+        reporter.log(message)
+    step.done(f"{result['in_place']} in place, {result['moved']} moved, {result['appended']} appended, "
+              f"{result['unchanged']} unchanged")
+
+    step = reporter.step("Replacing mini_obb.pak inside the OBB", os.path.getsize(REPACK_PAK), "bytes")
+    mode = replace_member(output_obb, PAK_MEMBER, REPACK_PAK, progress=step.update)
+    step.done(mode)
+    if mode == "shifted":
+        reporter.log("⚠️ The new mini_obb.pak did not fit its old slot; the members after it were moved up.")
+
+    step = reporter.step("Matching the original OBB size")
+    size_result = match_size(output_obb, original_size, allow_larger)
+    step.done(size_result)
+    expected_size = original_size
+    if size_result == "larger":
+        expected_size = os.path.getsize(output_obb)
+        reporter.log(f"⚠️ The OBB is {expected_size - original_size} bytes larger than the original.")
+
+    step = reporter.step("Verifying the rebuilt OBB", expected_size, "bytes")
+    problems = verify_obb(output_obb, expected_size, progress=step.update)["problems"]
+    step.done(f"{len(problems)} problem(s)" if problems else "ok")
+    if problems:
+        for problem in problems[:MAX_REPORTED]:
+            reporter.log(f"❌ {problem}")
+        raise VerifyError(f"{output_obb} failed verification with {len(problems)} problem(s)")
+    os.remove(SIZE_FILE)
+
+    reporter.log(f"=== OBB Repack Process Completed: {output_obb} ===")
+    return output_obb
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the OBB from the original and REPACK_OBB.")
+    parser.add_argument("--allow-larger", action="store_true",
+                        help="keep a valid but larger OBB when the original size cannot be reached")
+    args = parser.parse_args(argv)
+    with ProgressReporter() as reporter:
+        try:
+            repak_obb(reporter, args.allow_larger)
+        except (OSError, KeyError, ZipLayoutError, PakError, VerifyError, RepackError) as e:
+            reporter.log(f"❌ Repack failed: {e}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
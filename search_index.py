@@ -0,0 +1,124 @@
+import heapq
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Longest n-gram stored per field; longer queries intersect their trigrams.
+NGRAM_SIZE = 3
+# Number of ranked results returned (and printed) per query by default.
+TOP_K = 25
+# Cached queries per index; the cache is cleared when it fills up.
+QUERY_CACHE_SIZE = 256
+
+# Match quality, best first.
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _tokens(text):
+    return text.replace("-", " ").replace("(", " ").replace(")", " ").split()
+
+def _ngrams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def _trie_insert(trie, word, item_id):
+    node = trie
+    for ch in word:
+        node = node.setdefault(ch, {})
+    node.setdefault("", set()).add(item_id)
+
+def _trie_prefix_ids(trie, prefix):
+    node = trie
+    for ch in prefix:
+        node = node.get(ch)
+        if node is None:
+            return set()
+    ids = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        for key, child in node.items():
+            if key == "":
+                ids |= child
+            else:
+                stack.append(child)
+    return ids
+
+# ---------------------------
+# Main API
+# ---------------------------
+def build_search_index(items, fields):
+    """
+    Build a search index over items, where fields(item) returns the strings to search.
+    Returns {"items", "texts", "trie", "ngrams", "cache"}: a prefix trie of field words
+    and postings of every 1..NGRAM_SIZE-character substring, both mapping to item positions.
+    """
+    items = list(items)
+    texts = []
+    trie = {}
+    ngrams = {}
+    for item_id, item in enumerate(items):
+        item_texts = tuple(text.lower() for text in fields(item) if text)
+        texts.append(item_texts)
+        for text in item_texts:
+            for word in _tokens(text):
+                _trie_insert(trie, word, item_id)
+            for size in range(1, NGRAM_SIZE + 1):
+                for gram in _ngrams(text, size):
+                    ngrams.setdefault(gram, set()).add(item_id)
+    return {"items": items, "texts": texts, "trie": trie, "ngrams": ngrams, "cache": {}}
+
+def search(index, query, limit=TOP_K):
+    """
+    Return (matches, total) for items whose fields contain query (case-insensitive).
+    matches holds at most limit items ranked by match quality: exact, prefix,
+    word prefix, then any substring; ties go to the shorter text, then catalog order.
+    An empty query matches every item in catalog order.
+    """
+    query = query.lower().strip()
+    key = (query, limit)
+    cache = index["cache"]
+    if key in cache:
+        return cache[key]
+
+    items = index["items"]
+    texts = index["texts"]
+    if not query:
+        result = (items[:limit], len(items))
+    else:
+        size = min(len(query), NGRAM_SIZE)
+        candidates = None
+        for gram in sorted(_ngrams(query, size), key=lambda g: len(index["ngrams"].get(g, ()))):
+            postings = index["ngrams"].get(gram, set())
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                break
+        word_ids = _trie_prefix_ids(index["trie"], query) if " " not in query else set()
+
+        ranked = []
+        for item_id in candidates or ():
+            best = None
+            for text in texts[item_id]:
+                if query not in text:
+                    continue
+                if text == query:
+                    quality = EXACT
+                elif text.startswith(query):
+                    quality = PREFIX
+                elif item_id in word_ids:
+                    quality = WORD_PREFIX
+                else:
+                    quality = SUBSTRING
+                rank = (quality, len(text), item_id)
+                if best is None or rank < best:
+                    best = rank
+            if best is not None:
+                ranked.append(best)
+        top = heapq.nsmallest(limit, ranked)
+        result = ([items[item_id] for _, _, item_id in top], len(ranked))
+
+    if len(cache) >= QUERY_CACHE_SIZE:
+        cache.clear()
+    cache[key] = result
+    return result
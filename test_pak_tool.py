@@ -0,0 +1,161 @@
+import hashlib
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from pak_tool import (COMPRESSION_NAME_SIZE, MAX_VERSION, PAK_MAGIC, VERSION_COMPRESSION_BLOCKS,
+                      VERSION_COMPRESSION_NAMES, VERSION_FROZEN_INDEX, PakError, find_entry, pack_footer,
+                      read_entry, read_footer, read_pak, reimport_files, write_pak)
+
+# ---------------------------
+# Synthetic pak contents
+# ---------------------------
+def sample_files(seed=1):
+    rng = random.Random(seed)
+    return {
+        "ShadowTrackerExtra/Content/00000001.dat": rng.randbytes(3000),
+        # Compressible and larger than one block, so zlib entries get several blocks.
+        "ShadowTrackerExtra/Content/00000002.dat": b"vehicle skin " * 2000,
+        "ShadowTrackerExtra/Content/00000003.dat": b"",
+        "ShadowTrackerExtra/Content/00000004.dat": rng.randbytes(9000),
+    }
+
+def format_cases():
+    """(version, compression) pairs write_pak supports: zlib needs compression blocks (v3+)."""
+    for version in range(1, MAX_VERSION + 1):
+        yield version, "none"
+        if version >= VERSION_COMPRESSION_BLOCKS:
+            yield version, "zlib"
+
+
+class PakRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pak_path = os.path.join(self.tmp.name, "mini_obb.pak")
+        self.source = os.path.join(self.tmp.name, "REPACK_OBB")
+        os.makedirs(self.source)
+
+    def write_source(self, rel, data):
+        path = os.path.join(self.source, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def assert_contents(self, files):
+        pak = read_pak(self.pak_path)
+        self.assertEqual([entry["name"] for entry in pak["entries"]], list(files))
+        for name, data in files.items():
+            self.assertEqual(read_entry(pak, find_entry(pak, name)), data, name)
+        return pak
+
+    def test_write_read(self):
+        for version, method in format_cases():
+            with self.subTest(version=version, compression=method):
+                files = sample_files()
+                write_pak(self.pak_path, files, version, method, block_size=4096)
+                pak = self.assert_contents(files)
+                self.assertEqual(pak["version"], version)
+                self.assertEqual(pak["mount_point"], "../../../")
+
+    def test_reimport(self):
+        for version, method in format_cases():
+            for atomic in (True, False):
+                with self.subTest(version=version, compression=method, atomic=atomic):
+                    files = sample_files()
+                    write_pak(self.pak_path, files, version, method, block_size=4096)
+                    names = list(files)
+                    rng = random.Random(version)
+                    files[names[0]] = files[names[0]][:200]
+                    files[names[2]] = b"now has data"
+                    files[names[3]] = files[names[3]] + rng.randbytes(500)
+                    for name in (names[0], names[2], names[3]):
+                        self.write_source(name.rsplit("/", 1)[1], files[name])
+                    # Unchanged: skipped without rewriting the entry.
+                    self.write_source("sub/" + names[1].rsplit("/", 1)[1], files[names[1]])
+
+                    result = reimport_files(self.pak_path, self.source, atomic=atomic)
+                    self.assertEqual(result["unchanged"], 1)
+                    self.assertEqual(result["in_place"] + result["moved"] + result["appended"], 3)
+                    self.assert_contents(files)
+                    self.assertFalse(os.path.exists(self.pak_path + ".tmp"))
+
+                    # A second run finds nothing to change.
+                    again = reimport_files(self.pak_path, self.source, atomic=atomic)
+                    self.assertEqual(again["unchanged"], 4)
+                    self.assert_contents(files)
+                    for root, _, names_in_dir in os.walk(self.source):
+                        for name in names_in_dir:
+                            os.remove(os.path.join(root, name))
+
+    def test_reimport_reuses_freed_space(self):
+        files = sample_files()
+        write_pak(self.pak_path, files, 8, "none")
+        size = os.path.getsize(self.pak_path)
+        names = list(files)
+        # The last entry shrinks; the first grows into what it frees.
+        files[names[3]] = files[names[3]][:1000]
+        files[names[0]] = files[names[0]] + b"x" * 4000
+        self.write_source(names[3].rsplit("/", 1)[1], files[names[3]])
+        self.write_source(names[0].rsplit("/", 1)[1], files[names[0]])
+        result = reimport_files(self.pak_path, self.source)
+        self.assertEqual((result["in_place"], result["moved"], result["appended"]), (1, 1, 0))
+        self.assertLessEqual(os.path.getsize(self.pak_path), size)
+        self.assert_contents(files)
+
+    def test_reimport_reports_unmatched_and_refuses_clashes(self):
+        files = sample_files()
+        write_pak(self.pak_path, files, 4, "zlib")
+        self.write_source("00000009.dat", b"typo")
+        self.write_source("changelog.txt", b"not a pak entry")
+        result = reimport_files(self.pak_path, self.source)
+        self.assertEqual(len(result["messages"]), 1)
+        self.assertIn("00000009.dat", result["messages"][0])
+
+        self.write_source("a/00000001.dat", b"one")
+        self.write_source("b/00000001.dat", b"two")
+        with open(self.pak_path, "rb") as f:
+            before = f.read()
+        with self.assertRaises(PakError):
+            reimport_files(self.pak_path, self.source)
+        with open(self.pak_path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+
+class FooterLayoutTest(unittest.TestCase):
+    def build_footer(self, version, index):
+        """A footer laid out as Unreal writes it: key GUID, encrypted flag, magic, version,
+        index offset/size, index hash, frozen flag (v9), compression names."""
+        raw = b"\x11" * 16 + b"\x00" + struct.pack("<2I2Q", PAK_MAGIC, version, 1000, len(index))
+        raw += hashlib.sha1(index).digest()
+        if version >= VERSION_FROZEN_INDEX:
+            raw += b"\x00"
+        names = [b"Zlib", b"Oodle", b"", b"", b""]
+        return raw + b"".join(n.ljust(COMPRESSION_NAME_SIZE, b"\x00") for n in names)
+
+    def test_unreal_footer(self):
+        index = b"index"
+        for version in (VERSION_COMPRESSION_NAMES, VERSION_FROZEN_INDEX):
+            with self.subTest(version=version):
+                raw = self.build_footer(version, index)
+                footer = read_footer(io.BytesIO(b"\x00" * 1000 + index + raw))
+                self.assertEqual(footer["version"], version)
+                self.assertEqual((footer["index_offset"], footer["index_size"]), (1000, len(index)))
+                self.assertEqual(footer["frozen_index"], 0)
+                self.assertEqual(footer["compression_methods"], ["Zlib", "Oodle"])
+                self.assertEqual(pack_footer(footer, 1000, index), raw)
+
+    def test_frozen_flag_is_read_before_the_names(self):
+        index = b"index"
+        raw = bytearray(self.build_footer(VERSION_FROZEN_INDEX, index))
+        raw[17 + 24 + 20] = 1
+        footer = read_footer(io.BytesIO(b"\x00" * 1000 + index + bytes(raw)))
+        self.assertEqual(footer["frozen_index"], 1)
+        self.assertEqual(footer["compression_methods"], ["Zlib", "Oodle"])
+
+
+if __name__ == "__main__":
+    unittest.main()
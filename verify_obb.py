@@ -0,0 +1,297 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import zlib
+
+from obb_tool import (COPY_CHUNK, DEFLATED, DESCRIPTOR_SIG, LOCAL_SIG, LOCAL_STRUCT, PAK_MEMBER, STORED,
+                      ZIP64_EXTRA_ID, ZipLayoutError, find_member, member_data_offset, parse_extra,
+                      read_central_directory, read_zip_layout)
+from pak_tool import PakError, pack_entry_record, read_pak
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Problems printed by the command line before the rest are only counted.
+MAX_REPORTED = 20
+
+
+class VerifyError(Exception):
+    """Raised when a rebuilt OBB fails verification."""
+
+
+# ---------------------------
+# Range checks
+# ---------------------------
+class RangeChecker:
+    """
+    Checks byte ranges of the archive as the stream passes over them: "sha1" ranges are
+    hashed and compared with an expected digest, "bytes" ranges are compared byte for byte.
+    Only the ranges overlapping the current chunk are held, so memory stays flat.
+    """
+
+    def __init__(self, problems):
+        self.problems = problems
+        self.ranges = []
+        self.active = []
+        self.next = 0
+        self.checked = 0
+        self.sorted = False
+
+    def add(self, start, end, kind, expected, label):
+        self.sorted = False
+        self.ranges.append({"start": start, "end": end, "kind": kind, "expected": expected, "label": label})
+
+    def feed(self, offset, chunk):
+        if not self.sorted:
+            self.ranges.sort(key=lambda r: r["start"])
+            self.sorted = True
+        end = offset + len(chunk)
+        while self.next < len(self.ranges) and self.ranges[self.next]["start"] < end:
+            check = self.ranges[self.next]
+            self.next += 1
+            if check["start"] < offset:
+                self.checked += 1
+                self.problems.append(f"{check['label']}: range starts outside the streamed member data")
+                continue
+            check["state"] = hashlib.sha1() if check["kind"] == "sha1" else bytearray()
+            self.active.append(check)
+        view = memoryview(chunk)
+        for check in list(self.active):
+            lo = max(check["start"], offset) - offset
+            hi = min(check["end"], end) - offset
+            if check["kind"] == "sha1":
+                check["state"].update(view[lo:hi])
+            else:
+                check["state"].extend(view[lo:hi])
+            if check["end"] <= end:
+                self.active.remove(check)
+                self._finish(check)
+
+    def _finish(self, check):
+        self.checked += 1
+        value = check["state"].digest() if check["kind"] == "sha1" else bytes(check["state"])
+        if value != check["expected"]:
+            what = "hash mismatch" if check["kind"] == "sha1" else "does not match the index"
+            self.problems.append(f"{check['label']}: {what}")
+
+    def close(self):
+        missed = len(self.ranges) - self.checked
+        if missed:
+            self.problems.append(f"{missed} pak range(s) were not covered by the streamed data")
+
+def add_pak_checks(checker, obb_path, data_offset, length, problems):
+    """
+    Parse the pak stored at data_offset and queue its index hash, each entry's in-data
+    header and each entry's data hash for checking during the stream.
+    Returns the parsed pak, or None when it cannot be read.
+    """
+    try:
+        pak = read_pak(obb_path, data_offset, length)
+    except PakError as e:
+        problems.append(f"{PAK_MEMBER}: {e}")
+        return None
+    base = data_offset
+    checker.add(base + pak["index_offset"], base + pak["index_offset"] + pak["index_size"], "sha1",
+                pak["index_hash"], "pak index")
+    for entry in pak["entries"]:
+        header = pack_entry_record(entry, pak["version"], offset=0)
+        data_start = entry["offset"] + len(header)
+        if data_start + entry["size"] > pak["index_offset"]:
+            problems.append(f"pak entry {entry['name']}: data runs past the start of the index")
+            continue
+        checker.add(base + entry["offset"], base + data_start, "bytes", header, f"pak entry {entry['name']} header")
+        checker.add(base + data_start, base + data_start + entry["size"], "sha1", entry["hash"],
+                    f"pak entry {entry['name']}")
+    return pak
+
+# ---------------------------
+# Zip members
+# ---------------------------
+def local_sizes(fields, extra):
+    """(compressed size, file size) from a local header, reading zip64 values where saturated."""
+    compressed_size, file_size = fields[7], fields[8]
+    for header_id, data in parse_extra(extra):
+        if header_id != ZIP64_EXTRA_ID:
+            continue
+        values = list(struct.unpack_from("<%dQ" % (len(data) // 8), data))
+        if file_size == 0xFFFFFFFF and values:
+            file_size = values.pop(0)
+        if compressed_size == 0xFFFFFFFF and values:
+            compressed_size = values.pop(0)
+    return compressed_size, file_size
+
+def check_local_header(f, entry, problems):
+    """Read a member's local header at the current position and compare it with the central directory."""
+    name = entry["filename"]
+    header = f.read(LOCAL_STRUCT.size)
+    if len(header) < LOCAL_STRUCT.size or not header.startswith(LOCAL_SIG):
+        problems.append(f"{name}: bad local header signature")
+        return None
+    fields = LOCAL_STRUCT.unpack(header)
+    local_name = f.read(fields[9])
+    extra = f.read(fields[10])
+    if local_name != entry["name"]:
+        problems.append(f"{name}: local header names {local_name.decode('utf-8', 'replace')}")
+    if fields[3] != entry["method"]:
+        problems.append(f"{name}: local header method {fields[3]}, central directory {entry['method']}")
+    if not fields[2] & 0x8:
+        compressed_size, file_size = local_sizes(fields, extra)
+        if fields[6] != entry["crc"]:
+            problems.append(f"{name}: local header CRC {fields[6]:08x}, central directory {entry['crc']:08x}")
+        if (compressed_size, file_size) != (entry["compressed_size"], entry["file_size"]):
+            problems.append(f"{name}: local header sizes {compressed_size}/{file_size}, "
+                            f"central directory {entry['compressed_size']}/{entry['file_size']}")
+    return fields
+
+def stream_member(f, entry, checker, problems, progress, total):
+    """Stream a member's data from the current position, checking its CRC and size."""
+    name = entry["filename"]
+    offset = f.tell()
+    remaining = entry["compressed_size"]
+    inflater = zlib.decompressobj(-15) if entry["method"] == DEFLATED else None
+    crc = 0
+    out_size = 0
+    while remaining:
+        chunk = f.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            problems.append(f"{name}: archive ends inside member data")
+            return
+        checker.feed(offset, chunk)
+        offset += len(chunk)
+        remaining -= len(chunk)
+        if inflater:
+            try:
+                chunk = inflater.decompress(chunk)
+            except zlib.error as e:
+                problems.append(f"{name}: corrupt deflate data ({e})")
+                f.seek(offset + remaining)
+                return
+        if entry["method"] in (STORED, DEFLATED):
+            crc = zlib.crc32(chunk, crc)
+            out_size += len(chunk)
+        if progress:
+            progress(offset, total)
+    if entry["method"] not in (STORED, DEFLATED):
+        problems.append(f"{name}: CRC not checked (compression method {entry['method']})")
+        return
+    if inflater:
+        tail = inflater.flush()
+        crc = zlib.crc32(tail, crc)
+        out_size += len(tail)
+    if crc != entry["crc"]:
+        problems.append(f"{name}: CRC {crc:08x}, expected {entry['crc']:08x}")
+    if out_size != entry["file_size"]:
+        problems.append(f"{name}: {out_size} bytes after decompression, expected {entry['file_size']}")
+
+def check_descriptor(f, entry, problems):
+    """Check the data descriptor after a member written with flag bit 3."""
+    head = f.read(4)
+    crc_bytes = f.read(4) if head == DESCRIPTOR_SIG else head
+    wide = entry["compressed_size"] >= 0xFFFFFFFF or entry["file_size"] >= 0xFFFFFFFF
+    f.read(16 if wide else 8)
+    if len(crc_bytes) < 4 or struct.unpack("<L", crc_bytes)[0] != entry["crc"]:
+        problems.append(f"{entry['filename']}: data descriptor CRC does not match the central directory")
+
+# ---------------------------
+# Main API
+# ---------------------------
+def verify_obb(path, expected_size=None, pak_member=PAK_MEMBER, progress=None):
+    """
+    Check a rebuilt OBB in one forward pass over its members: every local header
+    against the central directory, every member's CRC32, and inside the stored pak
+    member the footer, the index hash, each entry's in-data header and data hash.
+    The archive size is compared with expected_size when given.
+    progress, if given, is called as progress(bytes streamed, archive size).
+    Returns {"problems", "members", "pak_entries", "size"}.
+    """
+    problems = []
+    result = {"problems": problems, "members": 0, "pak_entries": 0, "size": os.path.getsize(path)}
+    if expected_size is not None and result["size"] != expected_size:
+        problems.append(f"size is {result['size']} bytes, expected {expected_size} ({expected_size - result['size']:+d})")
+
+    checker = RangeChecker(problems)
+    with open(path, "rb") as f:
+        try:
+            layout = read_zip_layout(f)
+            entries = read_central_directory(f, layout)
+        except ZipLayoutError as e:
+            problems.append(str(e))
+            return result
+        result["members"] = len(entries)
+        if layout["trailing"]:
+            problems.append(f"{layout['trailing']} bytes after the end record (blind resize?)")
+        end_start = layout["zip64"]["offset"] if layout["zip64"] else layout["eocd_offset"]
+        if layout["cd_offset"] + layout["cd_size"] != end_start:
+            problems.append("central directory is not directly followed by the end records")
+
+        if pak_member:
+            try:
+                entry = find_member(entries, pak_member)
+            except KeyError as e:
+                problems.append(e.args[0])
+            else:
+                if entry["method"] != STORED:
+                    problems.append(f"{pak_member} is compressed (method {entry['method']}); pak not checked")
+                else:
+                    pak = add_pak_checks(checker, path, member_data_offset(f, entry), entry["compressed_size"], problems)
+                    if pak:
+                        result["pak_entries"] = len(pak["entries"])
+
+        position = 0
+        for entry in sorted(entries, key=lambda e: e["local_offset"]):
+            if entry["local_offset"] < position:
+                problems.append(f"{entry['filename']}: overlaps the previous member")
+            f.seek(entry["local_offset"])
+            if check_local_header(f, entry, problems) is None:
+                continue
+            stream_member(f, entry, checker, problems, progress, layout["size"])
+            if entry["flags"] & 0x8:
+                check_descriptor(f, entry, problems)
+            position = f.tell()
+        if position > layout["cd_offset"]:
+            problems.append("member data runs into the central directory")
+    checker.close()
+    if progress:
+        progress(layout["size"], layout["size"])
+    return result
+
+# ---------------------------
+# Command line
+# ---------------------------
+def expected_size_from(args):
+    if args.size is not None:
+        return args.size
+    if args.size_file:
+        with open(args.size_file, "r") as f:
+            return int(f.read().strip())
+    if args.original:
+        return os.path.getsize(args.original)
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify a rebuilt OBB: zip CRCs and headers, pak index and hashes, size.")
+    parser.add_argument("obb", help="rebuilt OBB to check")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--size", type=int, help="expected size in bytes")
+    group.add_argument("--size-file", help="file holding the expected size (sizeobb.ini)")
+    group.add_argument("--original", help="original OBB whose size must be matched")
+    parser.add_argument("--member", default=PAK_MEMBER, help=f"pak member to check (default: {PAK_MEMBER})")
+    args = parser.parse_args(argv)
+
+    print(f"🔍 Verifying {args.obb}...")
+    result = verify_obb(args.obb, expected_size_from(args), args.member)
+    problems = result["problems"]
+    print(f"📦 {result['members']} zip member(s), {result['pak_entries']} pak entries, {result['size']} bytes.")
+    if not problems:
+        print("✅ OBB verified: no problems found.")
+        return 0
+    for problem in problems[:MAX_REPORTED]:
+        print(f"❌ {problem}")
+    if len(problems) > MAX_REPORTED:
+        print(f"❌ ... and {len(problems) - MAX_REPORTED} more problem(s)")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())